@@ -0,0 +1,90 @@
+# aggregates.py
+from profiles import classify
+
+# Groupings kept in the result_aggregates table; "all" has a single empty key
+AGGREGATE_DIMENSIONS = ('all', 'profile', 'profession', 'day', 'analytical_bin', 'communication_bin')
+# Score histogram bins of width 1 / HISTOGRAM_BINS, keyed by their lower edge
+HISTOGRAM_BINS = 20
+
+
+class RunningStats:
+    """
+    Count, mean and sum of squared deviations (M2) for both scores.
+    Batches combine with the parallel form of Welford's algorithm, the
+    same formula the backends use to merge them into result_aggregates.
+    """
+
+    __slots__ = ('count', 'analytical_mean', 'analytical_m2', 'communication_mean', 'communication_m2')
+
+    def __init__(self, count=0, analytical_mean=0.0, analytical_m2=0.0,
+                 communication_mean=0.0, communication_m2=0.0):
+        self.count = count
+        self.analytical_mean = analytical_mean
+        self.analytical_m2 = analytical_m2
+        self.communication_mean = communication_mean
+        self.communication_m2 = communication_m2
+
+    def add(self, analytical_score: float, communication_score: float):
+        self.count += 1
+        delta = analytical_score - self.analytical_mean
+        self.analytical_mean += delta / self.count
+        self.analytical_m2 += delta * (analytical_score - self.analytical_mean)
+        delta = communication_score - self.communication_mean
+        self.communication_mean += delta / self.count
+        self.communication_m2 += delta * (communication_score - self.communication_mean)
+
+    def merge(self, other: 'RunningStats'):
+        if not other.count:
+            return
+        total = self.count + other.count
+        for dim in ('analytical', 'communication'):
+            mean, m2 = getattr(self, f'{dim}_mean'), getattr(self, f'{dim}_m2')
+            other_mean, other_m2 = getattr(other, f'{dim}_mean'), getattr(other, f'{dim}_m2')
+            delta = other_mean - mean
+            setattr(self, f'{dim}_mean', mean + delta * other.count / total)
+            setattr(self, f'{dim}_m2', m2 + other_m2 + delta * delta * self.count * other.count / total)
+        self.count = total
+
+    def as_dict(self) -> dict:
+        """Count, means and population variances"""
+        count = self.count or 1
+        # Rounding can leave M2 a hair below zero when every score is equal
+        return {
+            'count': self.count,
+            'analytical_mean': self.analytical_mean,
+            'analytical_variance': max(0.0, self.analytical_m2 / count),
+            'communication_mean': self.communication_mean,
+            'communication_variance': max(0.0, self.communication_m2 / count),
+        }
+
+
+def score_bin(score: float) -> str:
+    """Histogram bin key for a 0-1 score, e.g. "0.45" for [0.45, 0.50)"""
+    return f"{min(int(score * HISTOGRAM_BINS), HISTOGRAM_BINS - 1) / HISTOGRAM_BINS:.2f}"
+
+
+def aggregate_keys(profession: str, analytical_score: float, communication_score: float, created_at: str):
+    """The (dimension, key) pairs a single result contributes to"""
+    return (
+        ('all', ''),
+        ('profile', classify(analytical_score, communication_score)),
+        ('profession', profession),
+        ('day', str(created_at)[:10]),
+        ('analytical_bin', score_bin(analytical_score)),
+        ('communication_bin', score_bin(communication_score)),
+    )
+
+
+def aggregate_results(rows) -> dict:
+    """
+    Fold (profession, analytical_score, communication_score, created_at)
+    rows into {(dimension, key): RunningStats}
+    """
+    groups = {}
+    for profession, analytical_score, communication_score, created_at in rows:
+        for group in aggregate_keys(profession, analytical_score, communication_score, created_at):
+            stats = groups.get(group)
+            if stats is None:
+                stats = groups[group] = RunningStats()
+            stats.add(analytical_score, communication_score)
+    return groups
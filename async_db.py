@@ -0,0 +1,165 @@
+# async_db.py
+import asyncio
+import random
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+
+import config
+import database
+from metrics import timed
+
+
+class AsyncDatabase:
+    """
+    Runs blocking backend calls from a dedicated asyncio event loop thread.
+
+    submit() returns a concurrent.futures.Future immediately. Each call is
+    limited by a semaphore, bounded by a per-attempt timeout and retried
+    with exponential backoff and full jitter. A timed-out attempt cannot
+    interrupt the blocking call already running, so only idempotent
+    operations should be submitted (save_user and save_results with a
+    submission_id both are).
+    """
+
+    def __init__(self, max_concurrency: int = 16, timeout: float = 10.0, retries: int = 3,
+                 backoff_base: float = 0.2, backoff_max: float = 5.0):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="db-io")
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="db-event-loop", daemon=True)
+        self._thread.start()
+        self._semaphore = asyncio.run_coroutine_threadsafe(self._make_semaphore(), self._loop).result()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    async def _make_semaphore(self):
+        return asyncio.Semaphore(self.max_concurrency)
+
+    async def _call(self, fn, args, kwargs):
+        call = partial(fn, *args, **kwargs)
+        async with self._semaphore:
+            for attempt in range(self.retries + 1):
+                try:
+                    return await asyncio.wait_for(
+                        self._loop.run_in_executor(self._executor, call), self.timeout
+                    )
+                except Exception as e:
+                    if attempt == self.retries:
+                        raise
+                    delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                    print(f"Retrying {getattr(fn, '__name__', fn)} in {delay:.2f}s after error: {e!r}")
+                    await asyncio.sleep(delay)
+
+    @property
+    def max_call_time(self) -> float:
+        """Longest a submitted call can take once it holds the semaphore: every attempt times out, with the longest backoffs"""
+        backoff = sum(min(self.backoff_max, self.backoff_base * 2 ** attempt) for attempt in range(self.retries))
+        return (self.retries + 1) * self.timeout + backoff
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Schedule fn(*args, **kwargs) on the event loop thread"""
+        return asyncio.run_coroutine_threadsafe(self._call(fn, args, kwargs), self._loop)
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+
+
+_async_db = None
+_async_db_lock = threading.Lock()
+
+
+def get_async_db() -> AsyncDatabase:
+    global _async_db
+    if _async_db is None:
+        with _async_db_lock:
+            if _async_db is None:
+                _async_db = AsyncDatabase(
+                    max_concurrency=config.ASYNC_DB_CONCURRENCY,
+                    timeout=config.ASYNC_DB_TIMEOUT,
+                    retries=config.ASYNC_DB_RETRIES
+                )
+    return _async_db
+
+
+def _completed(value) -> Future:
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+def _log_failure(action: str):
+    def callback(future: Future):
+        if not future.cancelled() and future.exception() is not None:
+            print(f"Error {action}: {future.exception()}")
+    return callback
+
+
+def save_user_async(email: str, profession: str) -> Future:
+    """Future resolving to the user id; cached ids resolve immediately"""
+    user_id = database.cached_user_id(email)
+    if user_id is not None:
+        return _completed(user_id)
+
+    def save():
+        with timed('db.save_user'):
+            user_id = database.get_backend().save_user(email, profession)
+        database.remember_user_id(email, user_id)
+        return user_id
+
+    future = get_async_db().submit(save)
+    future.add_done_callback(_log_failure("saving user"))
+    return future
+
+
+def save_results_async(user_id: int, analytical_score: float, communication_score: float,
+                       submission_id: str = None, answers: bytes = None, bank_version: str = None) -> Future:
+    """Future resolving to the result id (or True once queued with WRITE_BEHIND)"""
+    if config.WRITE_BEHIND:
+        # Queueing is already non-blocking
+        return _completed(database.save_results(
+            user_id, analytical_score, communication_score,
+            submission_id=submission_id, answers=answers, bank_version=bank_version
+        ))
+
+    def save():
+        with timed('db.save_results'):
+            result_id = database.get_backend().save_results(
+                user_id, analytical_score, communication_score,
+                submission_id=submission_id, answers=answers, bank_version=bank_version
+            )
+        database.notify_results_written()
+        return result_id
+
+    future = get_async_db().submit(save)
+    future.add_done_callback(_log_failure("saving results"))
+    return future
+
+
+def resolve(value, timeout: float = None):
+    """
+    Return value, waiting for it first if it is a Future. The wait defaults
+    to the shared AsyncDatabase's max_call_time. None if the call failed or
+    is still running; a Future that is not done() may still succeed.
+    """
+    if not isinstance(value, Future):
+        return value
+    if timeout is None:
+        timeout = get_async_db().max_call_time
+    try:
+        return value.result(timeout=timeout)
+    except Exception:
+        return None
+
+
+def failed(value) -> bool:
+    """True once value is a Future that finished without a result"""
+    return isinstance(value, Future) and value.done() and (value.cancelled() or value.exception() is not None)
@@ -0,0 +1,53 @@
+# attempt.py
+# In-progress assessment state, kept small because one lives in every session
+
+
+class Attempt:
+    """
+    One in-progress attempt: a preallocated byte per question holding the
+    chosen option index, plus running score totals updated as each answer
+    arrives, so finishing never re-sums. Totals are added in question
+    order, matching ScoringMatrix exactly.
+    """
+
+    __slots__ = ('answers', 'count', 'analytical_total', 'communication_total')
+
+    def __init__(self, n_questions: int):
+        self.answers = bytearray(n_questions)
+        self.count = 0
+        self.analytical_total = 0.0
+        self.communication_total = 0.0
+
+    def __getstate__(self):
+        return (bytes(self.answers), self.count, self.analytical_total, self.communication_total)
+
+    def __setstate__(self, state):
+        answers, self.count, self.analytical_total, self.communication_total = state
+        self.answers = bytearray(answers)
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def complete(self) -> bool:
+        return self.count == len(self.answers)
+
+    def answer(self, bank, option_index: int):
+        """Record the option chosen for the next question of bank"""
+        if self.complete:
+            raise ValueError("All questions have already been answered")
+        option = bank[self.count].options[option_index]
+        self.answers[self.count] = option_index
+        self.analytical_total += option.analytical
+        self.communication_total += option.communication
+        self.count += 1
+
+    def scores(self) -> tuple:
+        """Return (analytical, communication) means over the questions answered so far"""
+        if not self.count:
+            return 0.0, 0.0
+        return self.analytical_total / self.count, self.communication_total / self.count
+
+    def packed(self) -> bytes:
+        """Answered option indices, one byte each, as stored with results"""
+        return bytes(self.answers[:self.count])
@@ -0,0 +1,263 @@
+# benchmarks/fake_supabase.py
+import bisect
+import random
+import re
+import threading
+import time
+from datetime import datetime
+from itertools import islice
+
+from aggregates import RunningStats, aggregate_keys
+
+_EMBED = re.compile(r'(\w+)!inner\(([^)]*)\)')
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeSupabaseClient:
+    """
+    In-memory stand-in for the subset of the Supabase client that
+    SupabaseBackend uses, so load tests measure the app rather than the
+    network. Every execute() sleeps latency seconds plus up to jitter
+    seconds, outside the lock, like a request in flight. result_aggregates
+    is kept up to date on insert the way the migration 004 trigger does.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, seed: int = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.tables = {'users': {}, 'results': {}, 'result_aggregates': {}}
+        self.calls = 0
+        self._next_ids = {'users': 1, 'results': 1}
+        # Sorted ids per table, so keyset pages don't rescan the whole table
+        self._ids = {'users': [], 'results': []}
+        # The unique columns upserts conflict on, value -> row
+        self._unique = {('users', 'email'): {}, ('results', 'submission_id'): {}}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _wait(self):
+        with self._lock:
+            self.calls += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def table(self, name: str) -> 'FakeQuery':
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: dict) -> 'FakeRpc':
+        return FakeRpc(self, name, params)
+
+    # Mutations below run with self._lock held
+
+    def _insert(self, table: str, row: dict) -> dict:
+        row = dict(row)
+        if table in self._next_ids:
+            if row.get('id') is None:
+                row['id'] = self._next_ids[table]
+            self._next_ids[table] = max(self._next_ids[table], row['id'] + 1)
+            if row['id'] not in self.tables[table]:
+                bisect.insort(self._ids[table], row['id'])
+        row.setdefault('created_at', datetime.now().isoformat())
+        self.tables[table][row['id']] = row
+        self._index(table, row)
+        if table == 'results':
+            self._aggregate(row)
+        return row
+
+    def _aggregate(self, row: dict):
+        user = self.tables['users'].get(row['user_id'], {})
+        for dimension, key in aggregate_keys(user.get('profession'), row['analytical_score'],
+                                             row['communication_score'], row['created_at']):
+            stats = self.tables['result_aggregates'].get((dimension, key))
+            if stats is None:
+                stats = self.tables['result_aggregates'][(dimension, key)] = RunningStats()
+            stats.add(row['analytical_score'], row['communication_score'])
+
+    def _index(self, table: str, row: dict):
+        for (indexed_table, column), index in self._unique.items():
+            if indexed_table == table and row.get(column) is not None:
+                index[row[column]] = row
+
+    def _find(self, table: str, column: str, value):
+        if column == 'id':
+            return self.tables[table].get(value)
+        index = self._unique.get((table, column))
+        if index is not None:
+            return index.get(value)
+        for row in self.tables[table].values():
+            if row.get(column) == value:
+                return row
+        return None
+
+    def _upsert_user(self, email: str, profession: str) -> int:
+        user = self._find('users', 'email', email)
+        if user is None:
+            user = self._insert('users', {'email': email, 'profession': profession})
+        return user['id']
+
+    def _rebuild_aggregates(self):
+        self.tables['result_aggregates'] = {}
+        for row in self.tables['results'].values():
+            self._aggregate(row)
+
+
+class FakeRpc:
+    def __init__(self, client: FakeSupabaseClient, name: str, params: dict):
+        self.client = client
+        self.name = name
+        self.params = params
+
+    def execute(self) -> FakeResponse:
+        self.client._wait()
+        client = self.client
+        with client._lock:
+            if self.name == 'upsert_user':
+                return FakeResponse(client._upsert_user(self.params['p_email'], self.params['p_profession']))
+            if self.name == 'update_result_scores':
+                for update in self.params['p_rows']:
+                    row = client.tables['results'].get(update['id'])
+                    if row is not None:
+                        row.update(update)
+                return FakeResponse(None)
+            if self.name == 'rebuild_result_aggregates':
+                client._rebuild_aggregates()
+                return FakeResponse(None)
+        raise NotImplementedError(f"FakeSupabaseClient has no RPC '{self.name}'")
+
+
+class FakeQuery:
+    """Chainable query builder; filters, ordering and limits apply to selects"""
+
+    def __init__(self, client: FakeSupabaseClient, table: str):
+        self.client = client
+        self.table = table
+        self._action = None
+        self._payload = None
+        self._on_conflict = None
+        self._ignore_duplicates = False
+        self._columns = '*'
+        self._filters = []
+        self._negate = False
+        self._order = None
+        self._limit = None
+        self._after_id = None
+
+    def select(self, columns: str = '*') -> 'FakeQuery':
+        self._action = self._action or 'select'
+        self._columns = columns
+        return self
+
+    def insert(self, rows) -> 'FakeQuery':
+        self._action, self._payload = 'insert', rows
+        return self
+
+    def upsert(self, rows, on_conflict: str = 'id', ignore_duplicates: bool = False) -> 'FakeQuery':
+        self._action, self._payload = 'upsert', rows
+        self._on_conflict = on_conflict
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def _filter(self, test) -> 'FakeQuery':
+        negate, self._negate = self._negate, False
+        self._filters.append((lambda row: not test(row)) if negate else test)
+        return self
+
+    def eq(self, column: str, value) -> 'FakeQuery':
+        return self._filter(lambda row: row.get(column) == value)
+
+    def gt(self, column: str, value) -> 'FakeQuery':
+        if column == 'id' and not self._negate:
+            self._after_id = value
+        return self._filter(lambda row: row.get(column) is not None and row[column] > value)
+
+    def gte(self, column: str, value) -> 'FakeQuery':
+        return self._filter(lambda row: self._value(row, column) is not None and self._value(row, column) >= value)
+
+    def lt(self, column: str, value) -> 'FakeQuery':
+        return self._filter(lambda row: self._value(row, column) is not None and self._value(row, column) < value)
+
+    def in_(self, column: str, values) -> 'FakeQuery':
+        values = set(values)
+        return self._filter(lambda row: self._value(row, column) in values)
+
+    def _value(self, row: dict, column: str):
+        # "users.profession" filters on the embedded users row
+        if '.' in column:
+            table, column = column.split('.', 1)
+            return self.client.tables[table].get(row.get(table[:-1] + '_id'), {}).get(column)
+        return row.get(column)
+
+    def is_(self, column: str, value) -> 'FakeQuery':
+        expected = None if value == 'null' else value
+        return self._filter(lambda row: row.get(column) is expected)
+
+    @property
+    def not_(self) -> 'FakeQuery':
+        self._negate = True
+        return self
+
+    def order(self, column: str, desc: bool = False) -> 'FakeQuery':
+        self._order = (column, desc)
+        return self
+
+    def limit(self, count: int) -> 'FakeQuery':
+        self._limit = count
+        return self
+
+    def execute(self) -> FakeResponse:
+        self.client._wait()
+        with self.client._lock:
+            if self._action in ('insert', 'upsert'):
+                return FakeResponse(self._write())
+            return FakeResponse(self._select())
+
+    def _write(self) -> list:
+        rows = self._payload if isinstance(self._payload, list) else [self._payload]
+        written = []
+        for row in rows:
+            existing = None
+            if self._action == 'upsert' and row.get(self._on_conflict) is not None:
+                existing = self.client._find(self.table, self._on_conflict, row[self._on_conflict])
+            if existing is None:
+                written.append(self.client._insert(self.table, row))
+            elif not self._ignore_duplicates:
+                existing.update(row)
+                self.client._index(self.table, existing)
+                written.append(existing)
+        return [dict(row) for row in written]
+
+    def _select(self) -> list:
+        client = self.client
+        if self.table == 'result_aggregates':
+            rows = [dict(dimension=dimension, key=key, **{s: getattr(stats, s) for s in RunningStats.__slots__})
+                    for (dimension, key), stats in client.tables['result_aggregates'].items()]
+        else:
+            table = client.tables[self.table]
+            ids = client._ids.get(self.table)
+            if ids is None:
+                rows = iter(table.values())
+            else:
+                start = 0 if self._after_id is None else bisect.bisect_right(ids, self._after_id)
+                rows = (table[row_id] for row_id in islice(ids, start, None))
+        rows = (row for row in rows if all(test(row) for test in self._filters))
+        if self._order and self._order != ('id', False):
+            column, desc = self._order
+            rows = sorted(rows, key=lambda row: row[column], reverse=desc)
+        # Rows already come out in id order, so a limit can stop early
+        rows = list(rows if self._limit is None else islice(rows, self._limit))
+        return [self._project(row) for row in rows]
+
+    def _project(self, row: dict) -> dict:
+        embeds = _EMBED.findall(self._columns)
+        plain = [c.strip() for c in _EMBED.sub('', self._columns).split(',') if c.strip()]
+        projected = dict(row) if plain == ['*'] else {c: row.get(c) for c in plain}
+        for table, columns in embeds:
+            # users!inner(...) follows the results.user_id foreign key
+            related = self.client.tables[table].get(row.get(table[:-1] + '_id'), {})
+            projected[table] = {c.strip(): related.get(c.strip()) for c in columns.split(',')}
+        return projected
@@ -0,0 +1,105 @@
+# benchmarks/flow.py
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.fake_supabase import FakeSupabaseClient
+from benchmarks.micro import PROFESSIONS
+from benchmarks.timing import summarize
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+STAGES = ('load', 'register', 'answer', 'results')
+
+
+def run_session(session: int, seed: int = 0, timeout: float = 60.0) -> dict:
+    """
+    Drive one user through register -> assessment -> results with
+    AppTest; returns the seconds spent in each script run, by stage.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed * 1_000_003 + session)
+    timings = {stage: [] for stage in STAGES}
+
+    def timed(stage, action):
+        started = time.perf_counter()
+        action()
+        timings[stage].append(time.perf_counter() - started)
+
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    timed('load', at.run)
+    at.text_input[0].input(f'loadtest{seed}-{session}@example.com')
+    at.selectbox[0].select(rng.choice(PROFESSIONS))
+    timed('register', at.button[0].click().run)
+    while at.session_state.stage == 'assessment':
+        attempt = at.session_state.attempt
+        # The last answer's run renders the results page
+        stage = 'results' if len(attempt) == len(attempt.answers) - 1 else 'answer'
+        timed(stage, at.button[rng.randrange(len(at.button))].click().run)
+    if at.exception or at.session_state.stage != 'results':
+        raise RuntimeError(f"Session {session} ended in stage {at.session_state.stage}: {at.exception}")
+    return timings
+
+
+_client = None
+
+
+def _init_worker(latency: float, jitter: float, seed: int):
+    global _client
+    import database
+
+    _client = FakeSupabaseClient(latency=latency, jitter=jitter, seed=seed + os.getpid())
+    database.set_backend(database.SupabaseBackend(client=_client))
+
+
+def _session_task(session: int, seed: int) -> tuple:
+    calls = _client.calls
+    started = time.perf_counter()
+    try:
+        timings = run_session(session, seed)
+    except Exception as e:
+        return None, None, _client.calls - calls, repr(e)
+    return timings, time.perf_counter() - started, _client.calls - calls, None
+
+
+def run_flow(sessions: int = 50, concurrency: int = 8, latency: float = 0.05, jitter: float = 0.0,
+             seed: int = 0) -> dict:
+    """
+    Run sessions complete assessments, concurrency at a time, each
+    process using a FakeSupabaseClient that adds latency (+ up to jitter)
+    seconds per call. AppTest keeps process-global runtime state, so
+    concurrent sessions run in separate worker processes rather than
+    the threads a Streamlit server would use.
+    """
+    timings = {stage: [] for stage in STAGES}
+    session_times = []
+    errors = []
+    backend_calls = 0
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=concurrency, initializer=_init_worker,
+                             initargs=(latency, jitter, seed)) as pool:
+        futures = [pool.submit(_session_task, session, seed) for session in range(sessions)]
+        for future in futures:
+            result, elapsed, calls, error = future.result()
+            backend_calls += calls
+            if error:
+                errors.append(error)
+                continue
+            session_times.append(elapsed)
+            for stage, values in result.items():
+                timings[stage].extend(values)
+    wall = time.perf_counter() - started
+
+    return {
+        'sessions': sessions,
+        'concurrency': concurrency,
+        'latency_ms': latency * 1000,
+        'jitter_ms': jitter * 1000,
+        'errors': len(errors),
+        'first_errors': errors[:5],
+        'backend_calls': backend_calls,
+        'session': summarize(session_times, wall),
+        'stages': {stage: summarize(values, wall) for stage, values in timings.items()},
+    }
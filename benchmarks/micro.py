@@ -0,0 +1,106 @@
+# benchmarks/micro.py
+import random
+import uuid
+
+import numpy as np
+
+from benchmarks.fake_supabase import FakeSupabaseClient
+from benchmarks.timing import measure
+
+PROFESSIONS = ["Data Analyst", "Data Scientist", "Business Analyst", "Student", "Other"]
+
+
+def bench_quadrant_plot(iterations: int = 500) -> dict:
+    from plots import create_quadrant_plot
+
+    rng = random.Random(0)
+    return measure(lambda: create_quadrant_plot(rng.random(), rng.random()), iterations)
+
+
+def bench_scoring(iterations: int = 10000, batch_size: int = 100000) -> dict:
+    from scoring import SCORING
+
+    rng = np.random.default_rng(0)
+    single = rng.integers(0, SCORING.option_counts, size=(iterations, SCORING.n_questions))
+    rows = iter(single.tolist())
+    batch = rng.integers(0, SCORING.option_counts, size=(batch_size, SCORING.n_questions))
+    batch_stats = measure(lambda: SCORING.score_batch(batch), 5)
+    # Report the batch in attempts per second
+    batch_stats['throughput_per_s'] *= batch_size
+    batch_stats['attempts_per_call'] = batch_size
+    return {
+        'score': measure(lambda: SCORING.score(next(rows)), iterations - 1),
+        'score_batch': batch_stats,
+    }
+
+
+def bench_is_valid_email(iterations: int = 100000) -> dict:
+    from validation import is_valid_email
+
+    emails = [
+        'jane.doe@example.com', 'bad..dots@example.com', 'no-at-sign.example.com',
+        'x' * 250 + '@example.com', 'analyst+tag@sub.domain.co.uk', 'user@localhost',
+    ]
+    rows = iter(emails * (iterations // len(emails) + 2))
+    return measure(lambda: is_valid_email(next(rows)), iterations)
+
+
+def bench_validate_emails(addresses: int = 1000000, iterations: int = 3) -> dict:
+    from validation import validate_emails
+
+    rng = random.Random(0)
+    domains = ['example.com', 'gmail.com', 'corp.co.uk', 'mail.tempmail.com', 'site.test', 'bad..domain.com']
+    emails = [f'user{rng.randrange(10 ** 9)}@{rng.choice(domains)}' for _ in range(addresses)]
+    stats = measure(lambda: validate_emails(emails), iterations)
+    # Report addresses per second
+    stats['throughput_per_s'] *= addresses
+    stats['addresses_per_call'] = addresses
+    return stats
+
+
+def seed_results(client: FakeSupabaseClient, rows: int, seed: int = 0):
+    """Fill the fake client with rows results spread over rows // 4 users"""
+    import database
+
+    rng = random.Random(seed)
+    latency, jitter = client.latency, client.jitter
+    client.latency = client.jitter = 0.0
+    try:
+        backend = database.SupabaseBackend(client=client)
+        users = max(1, rows // 4)
+        backend.save_users_bulk([
+            {'email': f'user{i}@example.com', 'profession': rng.choice(PROFESSIONS)} for i in range(users)
+        ])
+        for start in range(0, rows, 10000):
+            backend.save_results_bulk([{
+                'user_id': rng.randint(1, users),
+                'analytical_score': rng.random(),
+                'communication_score': rng.random(),
+                'submission_id': uuid.UUID(int=rng.getrandbits(128)).hex,
+            } for _ in range(start, min(rows, start + 10000))])
+    finally:
+        client.latency, client.jitter = latency, jitter
+
+
+def bench_get_all_results(rows: int = 50000, iterations: int = 5, latency: float = 0.0) -> dict:
+    import database
+
+    client = FakeSupabaseClient(latency=latency)
+    seed_results(client, rows)
+    database.set_backend(database.SupabaseBackend(client=client))
+    # Time backend reads, not the read-through cache
+    stats = measure(lambda: (database.clear_reads(), database.get_all_results()), iterations, warmup=0)
+    stats['rows'] = rows
+    stats['rows_per_s'] = rows / (stats['mean_ms'] / 1000) if stats['mean_ms'] else 0.0
+    return stats
+
+
+def run_micro(rows: int = 50000, quick: bool = False) -> dict:
+    scale = 10 if quick else 1
+    return {
+        'create_quadrant_plot': bench_quadrant_plot(500 // scale),
+        'scoring': bench_scoring(10000 // scale, 100000 // scale),
+        'is_valid_email': bench_is_valid_email(100000 // scale),
+        'validate_emails': bench_validate_emails(1000000 // scale),
+        'get_all_results': bench_get_all_results(rows // scale),
+    }
@@ -0,0 +1,79 @@
+# benchmarks/run.py
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime
+
+
+def _summaries(result: dict, path: str = ''):
+    """Yield (path, summary) for every latency summary nested in a result"""
+    if 'p95_ms' in result:
+        yield path, result
+        return
+    for key, value in result.items():
+        if isinstance(value, dict):
+            yield from _summaries(value, f"{path}.{key}" if path else key)
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    """Summaries whose p95 is more than tolerance slower than in baseline"""
+    previous = dict(_summaries(baseline))
+    regressions = []
+    for path, summary in _summaries(result):
+        before = previous.get(path)
+        if before and before['p95_ms'] > 0 and summary['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+            regressions.append({'benchmark': path, 'baseline_p95_ms': before['p95_ms'], 'p95_ms': summary['p95_ms']})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the assessment flow and its hot paths")
+    parser.add_argument('suite', nargs='?', choices=['micro', 'flow', 'all'], default='all')
+    parser.add_argument('--sessions', type=int, default=50, help="assessments to run in the flow suite")
+    parser.add_argument('--concurrency', type=int, default=8, help="concurrent sessions in the flow suite")
+    parser.add_argument('--latency-ms', type=float, default=50.0, help="simulated latency per backend call")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="extra random latency, up to this much")
+    parser.add_argument('--rows', type=int, default=50000, help="stored results for get_all_results")
+    parser.add_argument('--quick', action='store_true', help="a tenth of the micro-benchmark iterations")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="also write the JSON report to this file")
+    parser.add_argument('--baseline', help="earlier JSON report; exit 1 if any p95 regressed")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed p95 slowdown against the baseline")
+    args = parser.parse_args()
+
+    report = {
+        'started_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+    }
+    if args.suite in ('micro', 'all'):
+        from benchmarks.micro import run_micro
+        report['micro'] = run_micro(rows=args.rows, quick=args.quick)
+    if args.suite in ('flow', 'all'):
+        from benchmarks.flow import run_flow
+        report['flow'] = run_flow(
+            sessions=args.sessions,
+            concurrency=args.concurrency,
+            latency=args.latency_ms / 1000,
+            jitter=args.jitter_ms / 1000,
+            seed=args.seed
+        )
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        report['regressions'] = regressions
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
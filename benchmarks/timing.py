@@ -0,0 +1,39 @@
+# benchmarks/timing.py
+import math
+import time
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(q * len(sorted_values) / 100) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies: list, wall_seconds: float, operations: int = None) -> dict:
+    """Latency percentiles in milliseconds and throughput in operations per second"""
+    ordered = sorted(latencies)
+    operations = len(ordered) if operations is None else operations
+    return {
+        'count': operations,
+        'mean_ms': sum(ordered) / len(ordered) * 1000 if ordered else 0.0,
+        'p50_ms': percentile(ordered, 50) * 1000,
+        'p95_ms': percentile(ordered, 95) * 1000,
+        'p99_ms': percentile(ordered, 99) * 1000,
+        'max_ms': ordered[-1] * 1000 if ordered else 0.0,
+        'throughput_per_s': operations / wall_seconds if wall_seconds > 0 else 0.0,
+    }
+
+
+def measure(fn, iterations: int, warmup: int = 1) -> dict:
+    """Call fn() iterations times (after warmup calls) and summarize the latencies"""
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(latencies, time.perf_counter() - started)
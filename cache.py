@@ -0,0 +1,203 @@
+# cache.py
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire ttl seconds after being set"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ByteLRUCache:
+    """Thread-safe LRU cache of bytes values bounded by their total size"""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value: bytes):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._data[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
+class _Entry:
+    __slots__ = ('value', 'fresh_until', 'stale_until', 'generation')
+
+    def __init__(self, value, fresh_until: float, stale_until: float, generation: int):
+        self.value = value
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+        self.generation = generation
+
+
+class ReadThroughCache:
+    """
+    Thread-safe LRU read-through cache with stale-while-revalidate.
+
+    get(key, loader) returns a fresh value straight from memory. An entry
+    that is past its ttl (but within stale_ttl more) or was invalidated is
+    still returned at once while a single background thread reloads it,
+    so readers never wait on a refresh. Only a true miss calls loader in
+    the reader's thread, and concurrent misses for a key share one call.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 30.0, stale_ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0, 'errors': 0, 'evictions': 0}
+        self._data = OrderedDict()
+        self._loading = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, loader):
+        with self._lock:
+            entry = self._data.get(key)
+            now = time.monotonic()
+            if entry is not None and now < entry.stale_until:
+                self._data.move_to_end(key)
+                if now < entry.fresh_until and entry.generation == self._generation:
+                    self.stats['hits'] += 1
+                    return entry.value
+                self.stats['stale_hits'] += 1
+                if key not in self._loading:
+                    self._loading[key] = threading.Event()
+                    threading.Thread(target=self._refresh, args=(key, loader), daemon=True).start()
+                return entry.value
+            self.stats['misses'] += 1
+            loading = self._loading.get(key)
+            if loading is None:
+                loading = self._loading[key] = threading.Event()
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            # Another reader is already loading this key
+            loading.wait()
+            with self._lock:
+                entry = self._data.get(key)
+            if entry is not None:
+                return entry.value
+            # That load failed; try once more without holding up other readers
+            return loader()
+        return self._load(key, loader)
+
+    def _load(self, key, loader):
+        with self._lock:
+            generation = self._generation
+        try:
+            value = loader()
+        except Exception:
+            with self._lock:
+                self.stats['errors'] += 1
+            raise
+        else:
+            self._store(key, value, generation)
+            return value
+        finally:
+            with self._lock:
+                loading = self._loading.pop(key, None)
+            if loading is not None:
+                loading.set()
+
+    def _refresh(self, key, loader):
+        with self._lock:
+            self.stats['refreshes'] += 1
+        try:
+            self._load(key, loader)
+        except Exception as e:
+            # Readers keep the stale value until it runs out
+            print(f"Error refreshing cached {key!r}: {e}")
+
+    def _store(self, key, value, generation: int):
+        now = time.monotonic()
+        with self._lock:
+            self._data[key] = _Entry(value, now + self.ttl, now + self.ttl + self.stale_ttl, generation)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return dict(self.stats, entries=len(self._data))
+
+    def invalidate(self):
+        """Mark every entry stale: still served, but reloaded on the next read"""
+        with self._lock:
+            self._generation += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
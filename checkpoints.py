@@ -0,0 +1,138 @@
+# checkpoints.py
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+import config
+
+CHECKPOINT_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS checkpoint_events (
+        token TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        kind TEXT NOT NULL,
+        payload BLOB,
+        created_at REAL NOT NULL,
+        PRIMARY KEY (token, seq)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_checkpoint_events_created_at ON checkpoint_events (created_at);
+"""
+
+SQL_APPEND_EVENT = """
+    INSERT INTO checkpoint_events (token, seq, kind, payload, created_at)
+    SELECT ?, COALESCE(MAX(seq), -1) + 1, ?, ?, ? FROM checkpoint_events WHERE token = ?
+"""
+
+SQL_SELECT_EVENTS = "SELECT kind, payload, created_at FROM checkpoint_events WHERE token = ? ORDER BY seq"
+
+SQL_COMPACT = """
+    DELETE FROM checkpoint_events WHERE token IN (
+        SELECT token FROM checkpoint_events GROUP BY token HAVING MAX(created_at) < ?
+    )
+"""
+
+
+class CheckpointStore:
+    """
+    Partial attempts in a local SQLite file, keyed by an unguessable
+    resume token. Every step is one small appended row (start, user,
+    answer, complete) and loading replays them in order. Tokens idle for
+    longer than ttl are deleted by a compaction pass at most once per
+    compact_interval.
+    """
+
+    def __init__(self, path: str = None, ttl: float = None, compact_interval: float = 300.0):
+        self.path = path or config.CHECKPOINT_PATH
+        self.ttl = ttl if ttl is not None else config.CHECKPOINT_TTL
+        self.compact_interval = compact_interval
+        self._lock = threading.Lock()
+        self._last_compact = 0.0
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(CHECKPOINT_SCHEMA)
+
+    def _append(self, token: str, kind: str, payload: bytes = None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(SQL_APPEND_EVENT, (token, kind, payload, now, token))
+            if now - self._last_compact >= self.compact_interval:
+                self._last_compact = now
+                self._conn.execute(SQL_COMPACT, (now - self.ttl,))
+
+    def start(self, email: str, profession: str, bank_version: str, user_id: int = None) -> str:
+        """Open a checkpoint for a new attempt and return its resume token"""
+        token = secrets.token_urlsafe(16)
+        self._append(token, 'start', json.dumps({
+            'email': email,
+            'profession': profession,
+            'bank_version': bank_version,
+            'user_id': user_id,
+        }).encode('utf-8'))
+        return token
+
+    def set_user(self, token: str, user_id: int):
+        self._append(token, 'user', str(user_id).encode('ascii'))
+
+    def answer(self, token: str, option_index: int):
+        self._append(token, 'answer', bytes([option_index]))
+
+    def complete(self, token: str, submission_id: str):
+        self._append(token, 'complete', submission_id.encode('ascii'))
+
+    def load(self, token: str) -> dict:
+        """
+        Replay a checkpoint into {'email', 'profession', 'bank_version',
+        'user_id', 'answers', 'submission_id'}; None if it is unknown or expired.
+        """
+        with self._lock:
+            events = self._conn.execute(SQL_SELECT_EVENTS, (token,)).fetchall()
+        if not events or events[0][0] != 'start':
+            return None
+        # Idle for longer than ttl, whether or not compaction has run since
+        if max(created_at for _, _, created_at in events) < time.time() - self.ttl:
+            return None
+        state = json.loads(events[0][1])
+        state['answers'] = bytearray()
+        state['submission_id'] = None
+        for kind, payload, _ in events[1:]:
+            if kind == 'user':
+                state['user_id'] = int(payload)
+            elif kind == 'answer':
+                state['answers'] += payload
+            elif kind == 'complete':
+                state['submission_id'] = payload.decode('ascii')
+        return state
+
+    def discard(self, token: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM checkpoint_events WHERE token = ?", (token,))
+
+    def compact(self) -> int:
+        """Delete every checkpoint idle for longer than ttl; returns the rows removed"""
+        now = time.time()
+        with self._lock:
+            self._last_compact = now
+            return self._conn.execute(SQL_COMPACT, (now - self.ttl,)).rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_checkpoint_store() -> CheckpointStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CheckpointStore()
+    return _store
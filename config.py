@@ -3,6 +3,79 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-ADMIN_PASSWORD = os.getenv('ADMIN_PASSWORD', 'default_password')
+# Placeholder password; the admin page stays locked until ADMIN_PASSWORD is set to something else
+DEFAULT_ADMIN_PASSWORD = 'default_password'
+ADMIN_PASSWORD = os.getenv('ADMIN_PASSWORD', DEFAULT_ADMIN_PASSWORD)
 DATABASE_PATH = os.getenv('DATABASE_PATH', './data/assessment.db')
 ENVIRONMENT = os.getenv('ENVIRONMENT', 'development')
+
+# Storage backend: "supabase" (hosted) or "sqlite" (local, pooled)
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'supabase')
+SUPABASE_URL = os.getenv('SUPABASE_URL')
+SUPABASE_KEY = os.getenv('SUPABASE_KEY')
+SQLITE_POOL_SIZE = int(os.getenv('SQLITE_POOL_SIZE', '8'))
+SQLITE_BUSY_TIMEOUT = float(os.getenv('SQLITE_BUSY_TIMEOUT', '5'))
+
+# Write-behind queue for result rows
+WRITE_BEHIND = os.getenv('WRITE_BEHIND', 'false').lower() in ('1', 'true', 'yes')
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv('WRITE_BEHIND_BATCH_SIZE', '500'))
+WRITE_BEHIND_FLUSH_INTERVAL = float(os.getenv('WRITE_BEHIND_FLUSH_INTERVAL', '1.0'))
+WRITE_BEHIND_SPILL_PATH = os.getenv('WRITE_BEHIND_SPILL_PATH', './data/write_behind.jsonl')
+WRITE_BEHIND_DEAD_LETTER_PATH = os.getenv('WRITE_BEHIND_DEAD_LETTER_PATH', './data/write_behind_rejected.jsonl')
+
+# In-process email -> user id cache
+USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', '10000'))
+USER_CACHE_TTL = float(os.getenv('USER_CACHE_TTL', '3600'))
+
+# Pre-rendered static result images (PNG/SVG, needs kaleido)
+STATIC_RESULT_IMAGES = os.getenv('STATIC_RESULT_IMAGES', 'false').lower() in ('1', 'true', 'yes')
+RESULT_IMAGE_DIR = os.getenv('RESULT_IMAGE_DIR', './data/result_images')
+RESULT_IMAGE_STEP = float(os.getenv('RESULT_IMAGE_STEP', '0.02'))
+RESULT_IMAGE_MEMORY_BYTES = int(os.getenv('RESULT_IMAGE_MEMORY_BYTES', str(32 * 1024 * 1024)))
+RESULT_IMAGE_DISK_BYTES = int(os.getenv('RESULT_IMAGE_DISK_BYTES', str(512 * 1024 * 1024)))
+
+# Background event loop for database calls
+ASYNC_DB = os.getenv('ASYNC_DB', 'false').lower() in ('1', 'true', 'yes')
+ASYNC_DB_CONCURRENCY = int(os.getenv('ASYNC_DB_CONCURRENCY', '16'))
+ASYNC_DB_TIMEOUT = float(os.getenv('ASYNC_DB_TIMEOUT', '10'))
+ASYNC_DB_RETRIES = int(os.getenv('ASYNC_DB_RETRIES', '3'))
+
+# Question bank file (.json/.yaml); the built-in questions.py bank when unset
+QUESTION_BANK_PATH = os.getenv('QUESTION_BANK_PATH')
+
+# Server-side checkpoints of in-progress attempts, resumable via ?resume=<token>
+SESSION_CHECKPOINTS = os.getenv('SESSION_CHECKPOINTS', 'false').lower() in ('1', 'true', 'yes')
+CHECKPOINT_PATH = os.getenv('CHECKPOINT_PATH', './data/checkpoints.db')
+CHECKPOINT_TTL = float(os.getenv('CHECKPOINT_TTL', str(24 * 3600)))
+
+# Latency metrics for database calls, plots, scoring and app stages
+METRICS = os.getenv('METRICS', 'false').lower() in ('1', 'true', 'yes')
+METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))
+METRICS_JSON_PATH = os.getenv('METRICS_JSON_PATH')
+METRICS_JSON_INTERVAL = float(os.getenv('METRICS_JSON_INTERVAL', '60'))
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_DIR = os.getenv('PROFILE_DIR', './data/profiles')
+
+# Disposable email domains to reject at registration, one per line (a small built-in list when unset)
+DISPOSABLE_DOMAINS_PATH = os.getenv('DISPOSABLE_DOMAINS_PATH')
+
+# Read-through cache for reporting reads; a TTL of 0 disables it
+READ_CACHE_SIZE = int(os.getenv('READ_CACHE_SIZE', '256'))
+READ_CACHE_TTL = float(os.getenv('READ_CACHE_TTL', '30'))
+READ_CACHE_STALE_TTL = float(os.getenv('READ_CACHE_STALE_TTL', '300'))
+
+# Peer percentiles on the results page
+PERCENTILES = os.getenv('PERCENTILES', 'true').lower() in ('1', 'true', 'yes')
+PERCENTILE_SNAPSHOT_PATH = os.getenv('PERCENTILE_SNAPSHOT_PATH', './data/percentiles.npz')
+PERCENTILE_REFRESH_INTERVAL = float(os.getenv('PERCENTILE_REFRESH_INTERVAL', '60'))
+PERCENTILE_MIN_COUNT = int(os.getenv('PERCENTILE_MIN_COUNT', '20'))
+# Shade the results chart by where all respondents scored (the static image mode is unshaded)
+POPULATION_OVERLAY = os.getenv('POPULATION_OVERLAY', 'false').lower() in ('1', 'true', 'yes')
+
+# Standalone HTTP scoring service (scoring_service.py); without a token it only listens on loopback
+SCORING_SERVICE_HOST = os.getenv('SCORING_SERVICE_HOST', '127.0.0.1')
+SCORING_SERVICE_PORT = int(os.getenv('SCORING_SERVICE_PORT', '8600'))
+SCORING_SERVICE_WORKERS = int(os.getenv('SCORING_SERVICE_WORKERS', '1'))
+SCORING_SERVICE_MAX_BATCH = int(os.getenv('SCORING_SERVICE_MAX_BATCH', '10000'))
+SCORING_SERVICE_MAX_BODY = int(os.getenv('SCORING_SERVICE_MAX_BODY', str(8 * 1024 * 1024)))
+SCORING_SERVICE_TOKEN = os.getenv('SCORING_SERVICE_TOKEN', '')
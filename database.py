@@ -1,76 +1,874 @@
-# database.py
-import os
-from dotenv import load_dotenv
-from supabase import create_client, Client
-from datetime import datetime
-
-# Load environment variables
-load_dotenv()
-
-# Initialize Supabase client
-supabase: Client = create_client(
-    os.getenv("SUPABASE_URL"),
-    os.getenv("SUPABASE_KEY")
-)
-
-def init_db():
-    """
-    No need to initialize tables as they're managed in Supabase UI
-    or through migrations
-    """
-    pass
-
-def save_user(email: str, profession: str):
-    """Save a new user or get existing user ID"""
-    try:
-        # Check if user exists
-        response = supabase.table('users').select('id').eq('email', email).execute()
-        
-        if response.data:
-            return response.data[0]['id']
-            
-        # Create new user
-        response = supabase.table('users').insert({
-            'email': email,
-            'profession': profession,
-            'created_at': datetime.now().isoformat()
-        }).execute()
-        
-        return response.data[0]['id']
-    except Exception as e:
-        print(f"Error saving user: {e}")
-        return None
-
-def save_results(user_id: int, analytical_score: float, communication_score: float):
-    """Save assessment results"""
-    try:
-        response = supabase.table('results').insert({
-            'user_id': user_id,
-            'analytical_score': analytical_score,
-            'communication_score': communication_score,
-            'created_at': datetime.now().isoformat()
-        }).execute()
-        
-        return response.data[0]['id']
-    except Exception as e:
-        print(f"Error saving results: {e}")
-        return None
-
-def get_all_results():
-    """Get all results with user information"""
-    try:
-        response = supabase.table('results').select(
-            'users(email, profession), analytical_score, communication_score, created_at'
-        ).execute()
-        
-        # Format data to match existing structure
-        return [(
-            r['users']['email'],
-            r['users']['profession'],
-            r['analytical_score'],
-            r['communication_score'],
-            r['created_at']
-        ) for r in response.data]
-    except Exception as e:
-        print(f"Error fetching results: {e}")
-        return []
\ No newline at end of file
+# database.py
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+import config
+from aggregates import AGGREGATE_DIMENSIONS, HISTOGRAM_BINS, RunningStats, aggregate_results
+from cache import ReadThroughCache, TTLCache
+from metrics import timed
+from profiles import PROFILE_THRESHOLD, PROFILES
+from write_queue import WriteBehindQueue
+
+
+class StorageBackend:
+    """
+    Interface implemented by every storage engine.
+    Backend methods raise on failure; the module-level helpers below
+    log and swallow errors for the Streamlit app.
+    """
+
+    name = "base"
+    # Names the stored data (engine plus database location) so caches built
+    # from it are not reused against another database; None when unknown
+    identity = None
+
+    def init_db(self):
+        """Create tables if the engine manages its own schema"""
+
+    def save_user(self, email: str, profession: str) -> int:
+        """Return the id for email, creating the user atomically if it does not exist"""
+        raise NotImplementedError
+
+    def save_results(self, user_id: int, analytical_score: float, communication_score: float,
+                     submission_id: str = None, answers: bytes = None, bank_version: str = None) -> int:
+        """
+        Insert a result row and return its id. A repeated submission_id
+        returns the id of the row already stored for that submission.
+        answers holds the packed option indices scored under bank_version.
+        """
+        raise NotImplementedError
+
+    def save_users_bulk(self, rows: list):
+        """Insert user rows, skipping emails that already exist"""
+        raise NotImplementedError
+
+    def save_results_bulk(self, rows: list):
+        """Insert result rows in a single round-trip, skipping known submission ids"""
+        raise NotImplementedError
+
+    def upsert_users(self, rows: list) -> dict:
+        """
+        Insert users (email, profession) whose email is new and return
+        {email: id} for every row, existing users included
+        """
+        raise NotImplementedError
+
+    def existing_user_ids(self, user_ids) -> set:
+        """The subset of user_ids that belong to stored users"""
+        raise NotImplementedError
+
+    def max_user_id(self) -> int:
+        """Highest stored user id, 0 when there are no users"""
+        raise NotImplementedError
+
+    def load_bulk(self, users: list, results: list):
+        """
+        Insert users with explicit ids and results referring to them, for
+        bulk loads. Aggregates may be left stale; call rebuild_aggregates
+        once loading is done.
+        """
+        self.save_users_bulk(users)
+        self.save_results_bulk(results)
+
+    def iter_results(self, page_size: int = 1000, after_id: int = 0,
+                     since=None, until=None, professions=None):
+        """
+        Yield pages of results joined with their user, in result id order,
+        using keyset pagination so each page is one bounded query.
+        Rows are (id, email, profession, analytical_score, communication_score, created_at).
+        Optional filters run in the query: created at or after since, before
+        until (dates or ISO strings), and profession in professions.
+        """
+        raise NotImplementedError
+
+    def get_all_results(self) -> list:
+        return [row[1:] for page in self.iter_results() for row in page]
+
+    def iter_attempts(self, page_size: int = 1000, after_id: int = 0):
+        """
+        Yield pages of stored attempts that have raw answers, in id order.
+        Each row is a dict with id, user_id, answers (bytes) and bank_version.
+        """
+        raise NotImplementedError
+
+    def update_scores_bulk(self, rows: list):
+        """Overwrite scores for rows of id, analytical_score, communication_score, bank_version"""
+        raise NotImplementedError
+
+    def get_aggregates(self, dimension: str = None) -> dict:
+        """
+        Read the incrementally maintained result aggregates as
+        {(dimension, key): RunningStats}, optionally for one dimension.
+        """
+        raise NotImplementedError
+
+    def rebuild_aggregates(self):
+        """Recompute result aggregates from scratch (after bulk score updates)"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release connections held by the backend"""
+
+
+class SupabaseBackend(StorageBackend):
+    """Hosted Postgres through the Supabase REST API"""
+
+    name = "supabase"
+
+    def __init__(self, client=None, url: str = None, key: str = None):
+        if client is None:
+            # The supabase SDK is slow to import; only load it when this backend is used
+            from supabase import create_client
+            url = url or config.SUPABASE_URL
+            client = create_client(url, key or config.SUPABASE_KEY)
+            self.identity = f"supabase:{url}"
+        self.client = client
+
+    def save_user(self, email: str, profession: str) -> int:
+        # INSERT ... ON CONFLICT ... RETURNING id in one call (migration 002)
+        response = self.client.rpc('upsert_user', {
+            'p_email': email,
+            'p_profession': profession
+        }).execute()
+
+        return response.data
+
+    def save_results(self, user_id: int, analytical_score: float, communication_score: float,
+                     submission_id: str = None, answers: bytes = None, bank_version: str = None) -> int:
+        row = {
+            'user_id': user_id,
+            'analytical_score': analytical_score,
+            'communication_score': communication_score,
+            'created_at': datetime.now().isoformat(),
+            'answers': _to_bytea(answers),
+            'bank_version': bank_version
+        }
+        if submission_id is None:
+            response = self.client.table('results').insert(row).execute()
+            return response.data[0]['id']
+
+        row['submission_id'] = submission_id
+        response = self.client.table('results').upsert(
+            row, on_conflict='submission_id', ignore_duplicates=True
+        ).execute()
+        if response.data:
+            return response.data[0]['id']
+
+        # Duplicate submission: the row from the first write wins
+        response = self.client.table('results').select('id').eq('submission_id', submission_id).execute()
+        return response.data[0]['id']
+
+    def save_users_bulk(self, rows: list):
+        self.client.table('users').upsert(
+            rows, on_conflict='email', ignore_duplicates=True
+        ).execute()
+
+    def save_results_bulk(self, rows: list):
+        rows = [dict(r, answers=_to_bytea(r.get('answers'))) for r in rows]
+        keyed = [r for r in rows if r.get('submission_id')]
+        unkeyed = [r for r in rows if not r.get('submission_id')]
+        if keyed:
+            self.client.table('results').upsert(
+                keyed, on_conflict='submission_id', ignore_duplicates=True
+            ).execute()
+        if unkeyed:
+            self.client.table('results').insert(unkeyed).execute()
+
+    def upsert_users(self, rows: list) -> dict:
+        created_at = datetime.now().isoformat()
+        self.client.table('users').upsert([
+            {'email': r['email'], 'profession': r['profession'], 'created_at': created_at} for r in rows
+        ], on_conflict='email', ignore_duplicates=True).execute()
+        response = self.client.table('users').select('id, email').in_(
+            'email', list({r['email'] for r in rows})
+        ).execute()
+        return {r['email']: r['id'] for r in response.data}
+
+    def existing_user_ids(self, user_ids) -> set:
+        response = self.client.table('users').select('id').in_('id', list(set(user_ids))).execute()
+        return {r['id'] for r in response.data}
+
+    def max_user_id(self) -> int:
+        response = self.client.table('users').select('id').order('id', desc=True).limit(1).execute()
+        return response.data[0]['id'] if response.data else 0
+
+    def iter_results(self, page_size: int = 1000, after_id: int = 0,
+                     since=None, until=None, professions=None):
+        while True:
+            query = self.client.table('results').select(
+                'id, users!inner(email, profession), analytical_score, communication_score, created_at'
+            ).gt('id', after_id)
+            if since is not None:
+                query = query.gte('created_at', str(since))
+            if until is not None:
+                query = query.lt('created_at', str(until))
+            if professions:
+                query = query.in_('users.profession', list(professions))
+            response = query.order('id').limit(page_size).execute()
+            if not response.data:
+                return
+            yield [(
+                r['id'],
+                r['users']['email'],
+                r['users']['profession'],
+                r['analytical_score'],
+                r['communication_score'],
+                r['created_at']
+            ) for r in response.data]
+            after_id = response.data[-1]['id']
+
+    def iter_attempts(self, page_size: int = 1000, after_id: int = 0):
+        while True:
+            response = self.client.table('results').select(
+                'id, user_id, answers, bank_version'
+            ).gt('id', after_id).not_.is_('answers', 'null').order('id').limit(page_size).execute()
+            if not response.data:
+                return
+            yield [dict(r, answers=_from_bytea(r['answers'])) for r in response.data]
+            after_id = response.data[-1]['id']
+
+    def update_scores_bulk(self, rows: list):
+        # UPDATE ... FROM jsonb_to_recordset in one call (migration 003)
+        self.client.rpc('update_result_scores', {'p_rows': rows}).execute()
+
+    def get_aggregates(self, dimension: str = None) -> dict:
+        # Maintained by the results insert trigger (migration 004)
+        query = self.client.table('result_aggregates').select('*')
+        if dimension:
+            query = query.eq('dimension', dimension)
+        return {
+            (r['dimension'], r['key']): RunningStats(*(r[column] for column in RunningStats.__slots__))
+            for r in query.execute().data
+        }
+
+    def rebuild_aggregates(self):
+        self.client.rpc('rebuild_result_aggregates', {}).execute()
+
+
+def _to_bytea(data: bytes):
+    """Encode bytes in Postgres hex bytea format for PostgREST"""
+    return None if data is None else '\\x' + data.hex()
+
+
+def _from_bytea(value: str) -> bytes:
+    return None if value is None else bytes.fromhex(value[2:])
+
+
+# SQL is kept in module constants so every pooled connection reuses the
+# same compiled statement from sqlite3's per-connection statement cache.
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    email TEXT UNIQUE NOT NULL,
+    profession TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER,
+    analytical_score REAL,
+    communication_score REAL,
+    completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    submission_id TEXT,
+    answers BLOB,
+    bank_version TEXT,
+    FOREIGN KEY (user_id) REFERENCES users (id)
+);
+CREATE TABLE IF NOT EXISTS result_aggregates (
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    analytical_mean REAL NOT NULL,
+    analytical_m2 REAL NOT NULL,
+    communication_mean REAL NOT NULL,
+    communication_m2 REAL NOT NULL,
+    PRIMARY KEY (dimension, key)
+);
+"""
+# Columns added after the original schema, applied to existing databases
+SQLITE_RESULT_COLUMNS = {
+    'submission_id': "ALTER TABLE results ADD COLUMN submission_id TEXT",
+    'answers': "ALTER TABLE results ADD COLUMN answers BLOB",
+    'bank_version': "ALTER TABLE results ADD COLUMN bank_version TEXT",
+}
+SQLITE_INDEXES = """
+CREATE UNIQUE INDEX IF NOT EXISTS idx_results_submission_id ON results (submission_id);
+"""
+# The no-op update makes RETURNING yield the existing id on conflict
+SQL_UPSERT_USER = (
+    "INSERT INTO users (email, profession, created_at) VALUES (?, ?, ?) "
+    "ON CONFLICT(email) DO UPDATE SET email = excluded.email RETURNING id"
+)
+SQL_INSERT_RESULT = (
+    "INSERT INTO results (user_id, analytical_score, communication_score, completed_at, "
+    "submission_id, answers, bank_version) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(submission_id) DO NOTHING"
+)
+SQL_SELECT_RESULT_ID = "SELECT id FROM results WHERE submission_id = ?"
+SQL_INSERT_USER_IGNORE = (
+    "INSERT INTO users (email, profession, created_at) VALUES (?, ?, ?) "
+    "ON CONFLICT(email) DO NOTHING"
+)
+SQL_SELECT_PROFESSION = "SELECT profession FROM users WHERE id = ?"
+SQL_INSERT_USER_WITH_ID = "INSERT INTO users (id, email, profession, created_at) VALUES (?, ?, ?, ?)"
+SQL_SELECT_MAX_USER_ID = "SELECT COALESCE(MAX(id), 0) FROM users"
+SQL_SELECT_USER_IDS_BY_EMAIL = "SELECT email, id FROM users WHERE email IN ({placeholders})"
+SQL_SELECT_USER_IDS = "SELECT id FROM users WHERE id IN ({placeholders})"
+# Stays under SQLite's bound-parameter limit in IN (...) lookups
+SQLITE_IN_CHUNK = 500
+# Merge a batch's (count, mean, M2) into the stored aggregate; SET
+# expressions read the pre-update column values
+SQL_MERGE_AGGREGATE = (
+    "INSERT INTO result_aggregates (dimension, key, count, analytical_mean, analytical_m2, "
+    "communication_mean, communication_m2) VALUES (?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(dimension, key) DO UPDATE SET "
+    "count = count + excluded.count, "
+    "analytical_mean = analytical_mean + (excluded.analytical_mean - analytical_mean) "
+    "* excluded.count / (count + excluded.count), "
+    "analytical_m2 = analytical_m2 + excluded.analytical_m2 + (excluded.analytical_mean - analytical_mean) "
+    "* (excluded.analytical_mean - analytical_mean) * count * excluded.count / (count + excluded.count), "
+    "communication_mean = communication_mean + (excluded.communication_mean - communication_mean) "
+    "* excluded.count / (count + excluded.count), "
+    "communication_m2 = communication_m2 + excluded.communication_m2 "
+    "+ (excluded.communication_mean - communication_mean) "
+    "* (excluded.communication_mean - communication_mean) * count * excluded.count / (count + excluded.count)"
+)
+SQL_SELECT_AGGREGATES = (
+    "SELECT dimension, key, count, analytical_mean, analytical_m2, communication_mean, communication_m2 "
+    "FROM result_aggregates"
+)
+_SQL_PROFILE = (
+    f"CASE WHEN r.analytical_score >= {PROFILE_THRESHOLD} "
+    f"THEN CASE WHEN r.communication_score >= {PROFILE_THRESHOLD} THEN '{PROFILES[3]}' ELSE '{PROFILES[2]}' END "
+    f"ELSE CASE WHEN r.communication_score >= {PROFILE_THRESHOLD} THEN '{PROFILES[1]}' ELSE '{PROFILES[0]}' END END"
+)
+_SQL_AGGREGATE_KEYS = {
+    'all': "''",
+    'profile': _SQL_PROFILE,
+    'profession': "COALESCE(u.profession, '')",
+    'day': "substr(r.completed_at, 1, 10)",
+    'analytical_bin': (
+        f"printf('%.2f', min(CAST(r.analytical_score * {HISTOGRAM_BINS} AS INTEGER), {HISTOGRAM_BINS - 1}) "
+        f"/ {float(HISTOGRAM_BINS)})"
+    ),
+    'communication_bin': (
+        f"printf('%.2f', min(CAST(r.communication_score * {HISTOGRAM_BINS} AS INTEGER), {HISTOGRAM_BINS - 1}) "
+        f"/ {float(HISTOGRAM_BINS)})"
+    ),
+}
+# M2 sums squared deviations from the group mean (computed by a window in
+# the subquery); sum(x*x) - sum(x)*mean can round below zero
+SQL_REBUILD_AGGREGATES = ["DELETE FROM result_aggregates"] + [
+    "INSERT INTO result_aggregates "
+    f"SELECT '{dimension}', k, count(*), "
+    "avg(a), sum((a - a_mean) * (a - a_mean)), "
+    "avg(c), sum((c - c_mean) * (c - c_mean)) "
+    "FROM ("
+    "SELECT k, a, c, avg(a) OVER w AS a_mean, avg(c) OVER w AS c_mean FROM ("
+    f"SELECT {key} AS k, r.analytical_score AS a, r.communication_score AS c "
+    "FROM results r LEFT JOIN users u ON u.id = r.user_id"
+    ") WINDOW w AS (PARTITION BY k)"
+    ") GROUP BY k"
+    for dimension, key in _SQL_AGGREGATE_KEYS.items()
+]
+SQL_SELECT_ATTEMPTS = (
+    "SELECT id, user_id, answers, bank_version FROM results "
+    "WHERE id > ? AND answers IS NOT NULL ORDER BY id LIMIT ?"
+)
+SQL_UPDATE_SCORES = (
+    "UPDATE results SET analytical_score = ?, communication_score = ?, bank_version = ? "
+    "WHERE id = ?"
+)
+SQL_SELECT_RESULTS_PAGE = (
+    "SELECT r.id, u.email, u.profession, r.analytical_score, r.communication_score, r.completed_at "
+    "FROM results r JOIN users u ON u.id = r.user_id "
+    "WHERE r.id > ?{filters} ORDER BY r.id LIMIT ?"
+)
+
+
+class SQLiteBackend(StorageBackend):
+    """Local SQLite database in WAL mode with a bounded connection pool"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str = None, pool_size: int = None, timeout: float = None):
+        self.path = path or config.DATABASE_PATH
+        self.identity = f"sqlite:{os.path.abspath(self.path)}"
+        self.pool_size = pool_size or config.SQLITE_POOL_SIZE
+        self.timeout = timeout if timeout is not None else config.SQLITE_BUSY_TIMEOUT
+        self._pool = queue.LifoQueue(maxsize=self.pool_size)
+        self._created = 0
+        self._lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=64
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled connection, opening a new one while under pool_size"""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._created < self.pool_size
+                if can_open:
+                    self._created += 1
+            if can_open:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                conn = self._pool.get(timeout=self.timeout)
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._pool.put(conn)
+
+    def init_db(self):
+        if self._schema_ready:
+            return
+        with self.connection() as conn:
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            conn.executescript(SQLITE_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(results)")}
+            for column, ddl in SQLITE_RESULT_COLUMNS.items():
+                if column not in columns:
+                    conn.execute(ddl)
+            conn.executescript(SQLITE_INDEXES)
+        if 'result_aggregates' not in tables:
+            # Backfill aggregates for results written before the table existed
+            self.rebuild_aggregates()
+        self._schema_ready = True
+
+    def save_user(self, email: str, profession: str) -> int:
+        with self.connection() as conn, conn:
+            return conn.execute(SQL_UPSERT_USER, (email, profession, datetime.now().isoformat())).fetchone()[0]
+
+    def _insert_results(self, conn: sqlite3.Connection, rows: list) -> list:
+        """
+        Insert result rows and fold the ones actually written (not duplicate
+        submissions) into result_aggregates in the same transaction.
+        Returns the new row ids, None for skipped duplicates.
+        """
+        ids = []
+        inserted = []
+        professions = {}
+        for r in rows:
+            cursor = conn.execute(SQL_INSERT_RESULT, (
+                r['user_id'],
+                r['analytical_score'],
+                r['communication_score'],
+                r['created_at'],
+                r.get('submission_id'),
+                r.get('answers'),
+                r.get('bank_version')
+            ))
+            if not cursor.rowcount:
+                ids.append(None)
+                continue
+            ids.append(cursor.lastrowid)
+            user_id = r['user_id']
+            if user_id not in professions:
+                row = conn.execute(SQL_SELECT_PROFESSION, (user_id,)).fetchone()
+                professions[user_id] = row[0] if row else ''
+            inserted.append((professions[user_id], r['analytical_score'], r['communication_score'], r['created_at']))
+
+        conn.executemany(SQL_MERGE_AGGREGATE, [
+            (dimension, key, stats.count, stats.analytical_mean, stats.analytical_m2,
+             stats.communication_mean, stats.communication_m2)
+            for (dimension, key), stats in aggregate_results(inserted).items()
+        ])
+        return ids
+
+    def save_results(self, user_id: int, analytical_score: float, communication_score: float,
+                     submission_id: str = None, answers: bytes = None, bank_version: str = None) -> int:
+        with self.connection() as conn, conn:
+            result_id = self._insert_results(conn, [{
+                'user_id': user_id,
+                'analytical_score': analytical_score,
+                'communication_score': communication_score,
+                'created_at': datetime.now().isoformat(),
+                'submission_id': submission_id,
+                'answers': answers,
+                'bank_version': bank_version
+            }])[0]
+            if result_id is not None:
+                return result_id
+            return conn.execute(SQL_SELECT_RESULT_ID, (submission_id,)).fetchone()[0]
+
+    def save_users_bulk(self, rows: list):
+        with self.connection() as conn, conn:
+            conn.executemany(SQL_INSERT_USER_IGNORE, [
+                (r['email'], r['profession'], r['created_at']) for r in rows
+            ])
+
+    def save_results_bulk(self, rows: list):
+        with self.connection() as conn, conn:
+            self._insert_results(conn, rows)
+
+    def _select_in(self, conn: sqlite3.Connection, sql: str, values: list) -> list:
+        rows = []
+        for start in range(0, len(values), SQLITE_IN_CHUNK):
+            chunk = values[start:start + SQLITE_IN_CHUNK]
+            rows.extend(conn.execute(sql.format(placeholders=', '.join('?' * len(chunk))), chunk).fetchall())
+        return rows
+
+    def upsert_users(self, rows: list) -> dict:
+        created_at = datetime.now().isoformat()
+        with self.connection() as conn, conn:
+            conn.executemany(SQL_INSERT_USER_IGNORE, [(r['email'], r['profession'], created_at) for r in rows])
+            return dict(self._select_in(conn, SQL_SELECT_USER_IDS_BY_EMAIL, list({r['email'] for r in rows})))
+
+    def existing_user_ids(self, user_ids) -> set:
+        with self.connection() as conn:
+            return {row[0] for row in self._select_in(conn, SQL_SELECT_USER_IDS, list(set(user_ids)))}
+
+    def max_user_id(self) -> int:
+        with self.connection() as conn:
+            return conn.execute(SQL_SELECT_MAX_USER_ID).fetchone()[0]
+
+    def load_bulk(self, users: list, results: list):
+        # One transaction and two executemany calls; skips the per-row
+        # aggregate upkeep of _insert_results
+        with self.connection() as conn, conn:
+            conn.executemany(SQL_INSERT_USER_WITH_ID, [
+                (r['id'], r['email'], r['profession'], r['created_at']) for r in users
+            ])
+            conn.executemany(SQL_INSERT_RESULT, [(
+                r['user_id'],
+                r['analytical_score'],
+                r['communication_score'],
+                r['created_at'],
+                r.get('submission_id'),
+                r.get('answers'),
+                r.get('bank_version')
+            ) for r in results])
+
+    def iter_results(self, page_size: int = 1000, after_id: int = 0,
+                     since=None, until=None, professions=None):
+        filters, params = [], []
+        if since is not None:
+            filters.append(" AND r.completed_at >= ?")
+            params.append(str(since))
+        if until is not None:
+            filters.append(" AND r.completed_at < ?")
+            params.append(str(until))
+        if professions:
+            professions = list(professions)
+            filters.append(f" AND u.profession IN ({', '.join('?' * len(professions))})")
+            params.extend(professions)
+        sql = SQL_SELECT_RESULTS_PAGE.format(filters=''.join(filters))
+        while True:
+            with self.connection() as conn:
+                page = conn.execute(sql, (after_id, *params, page_size)).fetchall()
+            if not page:
+                return
+            yield page
+            after_id = page[-1][0]
+
+    def iter_attempts(self, page_size: int = 1000, after_id: int = 0):
+        columns = ('id', 'user_id', 'answers', 'bank_version')
+        while True:
+            with self.connection() as conn:
+                page = conn.execute(SQL_SELECT_ATTEMPTS, (after_id, page_size)).fetchall()
+            if not page:
+                return
+            yield [dict(zip(columns, row)) for row in page]
+            after_id = page[-1][0]
+
+    def update_scores_bulk(self, rows: list):
+        with self.connection() as conn, conn:
+            conn.executemany(SQL_UPDATE_SCORES, [(
+                r['analytical_score'],
+                r['communication_score'],
+                r['bank_version'],
+                r['id']
+            ) for r in rows])
+
+    def get_aggregates(self, dimension: str = None) -> dict:
+        with self.connection() as conn:
+            if dimension:
+                rows = conn.execute(SQL_SELECT_AGGREGATES + " WHERE dimension = ?", (dimension,)).fetchall()
+            else:
+                rows = conn.execute(SQL_SELECT_AGGREGATES).fetchall()
+        return {(r[0], r[1]): RunningStats(*r[2:]) for r in rows}
+
+    def rebuild_aggregates(self):
+        with self.connection() as conn, conn:
+            for statement in SQL_REBUILD_AGGREGATES:
+                conn.execute(statement)
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._created = 0
+
+
+BACKENDS = {
+    SupabaseBackend.name: SupabaseBackend,
+    SQLiteBackend.name: SQLiteBackend,
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+_write_queue = None
+# email -> user id, so returning users skip the backend entirely
+_user_ids = TTLCache(config.USER_CACHE_SIZE, config.USER_CACHE_TTL)
+# Shared results of the reporting reads (get_all_results, get_aggregates)
+_reads = ReadThroughCache(config.READ_CACHE_SIZE, config.READ_CACHE_TTL, config.READ_CACHE_STALE_TTL)
+_write_listeners = []
+
+
+def create_backend(name: str = None) -> StorageBackend:
+    """Instantiate the backend registered under name (defaults to config.STORAGE_BACKEND)"""
+    name = (name or config.STORAGE_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown storage backend '{name}', expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+def get_backend() -> StorageBackend:
+    """Return the process-wide backend, creating it on first use"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend()
+    return _backend
+
+
+def set_backend(backend: StorageBackend):
+    """Replace the process-wide backend (e.g. for load tests)"""
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, backend
+        _user_ids.clear()
+        _reads.clear()
+    if previous is not None and previous is not backend:
+        previous.close()
+
+
+def get_write_queue() -> WriteBehindQueue:
+    """Return the process-wide write-behind queue, starting its flusher on first use"""
+    global _write_queue
+    if _write_queue is None:
+        with _backend_lock:
+            if _write_queue is None:
+                _write_queue = WriteBehindQueue(
+                    get_backend,
+                    max_batch=config.WRITE_BEHIND_BATCH_SIZE,
+                    flush_interval=config.WRITE_BEHIND_FLUSH_INTERVAL,
+                    spill_path=config.WRITE_BEHIND_SPILL_PATH,
+                    dead_letter_path=config.WRITE_BEHIND_DEAD_LETTER_PATH,
+                    on_write=notify_results_written
+                )
+    return _write_queue
+
+
+def invalidate_reads():
+    """Mark cached reads stale after a write; they are served once more while being reloaded"""
+    _reads.invalidate()
+
+def add_write_listener(listener):
+    """Call listener() after every result write this process makes"""
+    _write_listeners.append(listener)
+
+def notify_results_written():
+    invalidate_reads()
+    for listener in _write_listeners:
+        try:
+            listener()
+        except Exception as e:
+            print(f"Error in write listener: {e}")
+
+def clear_reads():
+    """Drop cached reads so the next read waits for current data (e.g. an explicit refresh)"""
+    _reads.clear()
+
+def read_cache_stats() -> dict:
+    """Hit, stale hit, miss, refresh, error and eviction counts of the read cache"""
+    return _reads.get_stats()
+
+def _cached_read(key, loader):
+    if config.READ_CACHE_TTL <= 0:
+        return loader()
+    return _reads.get(key, loader)
+
+def init_db():
+    """
+    Supabase tables are managed in the Supabase UI or through migrations;
+    the SQLite backend creates its schema on first call
+    """
+    with timed('db.init_db'):
+        get_backend().init_db()
+
+def cached_user_id(email: str):
+    """User id for email from the in-process cache, or None"""
+    return _user_ids.get(email)
+
+def remember_user_id(email: str, user_id: int):
+    if user_id is not None:
+        _user_ids.set(email, user_id)
+
+def save_user(email: str, profession: str):
+    """Save a new user or get existing user ID"""
+    user_id = _user_ids.get(email)
+    if user_id is not None:
+        return user_id
+    try:
+        with timed('db.save_user'):
+            user_id = get_backend().save_user(email, profession)
+        _user_ids.set(email, user_id)
+        return user_id
+    except Exception as e:
+        print(f"Error saving user: {e}")
+        return None
+
+def save_results(user_id: int, analytical_score: float, communication_score: float,
+                 submission_id: str = None, answers: bytes = None, bank_version: str = None):
+    """
+    Save assessment results, optionally with the packed raw answers.
+    Passing the same submission_id again never creates a second row.
+    Returns the result id, or True when the row was handed to the
+    write-behind queue (config.WRITE_BEHIND)
+    """
+    try:
+        if config.WRITE_BEHIND:
+            with timed('db.enqueue_results'):
+                return get_write_queue().enqueue('results', {
+                    'user_id': user_id,
+                    'analytical_score': analytical_score,
+                    'communication_score': communication_score,
+                    'created_at': datetime.now().isoformat(),
+                    'submission_id': submission_id,
+                    'answers': answers,
+                    'bank_version': bank_version
+                })
+        with timed('db.save_results'):
+            result_id = get_backend().save_results(
+                user_id, analytical_score, communication_score,
+                submission_id=submission_id, answers=answers, bank_version=bank_version
+            )
+        notify_results_written()
+        return result_id
+    except Exception as e:
+        print(f"Error saving results: {e}")
+        return None
+
+def upsert_users(rows: list) -> dict:
+    """
+    User ids for many (email, profession) rows in one round-trip, creating
+    the new ones. Cached emails skip the backend. Returns {email: id},
+    or None when the backend failed.
+    """
+    user_ids = {}
+    missing = []
+    for row in rows:
+        user_id = _user_ids.get(row['email'])
+        if user_id is None:
+            missing.append(row)
+        else:
+            user_ids[row['email']] = user_id
+    if not missing:
+        return user_ids
+    try:
+        with timed('db.upsert_users'):
+            created = get_backend().upsert_users(missing)
+    except Exception as e:
+        print(f"Error saving users: {e}")
+        return None
+    for email, user_id in created.items():
+        _user_ids.set(email, user_id)
+    user_ids.update(created)
+    return user_ids
+
+def existing_user_ids(user_ids) -> set:
+    """The stored subset of user_ids, or None when the backend failed"""
+    try:
+        with timed('db.existing_user_ids'):
+            return get_backend().existing_user_ids(user_ids)
+    except Exception as e:
+        print(f"Error checking users: {e}")
+        return None
+
+def save_results_bulk(rows: list) -> bool:
+    """
+    Save many result rows (as for StorageBackend.save_results_bulk) in one
+    round-trip, or hand them to the write-behind queue (config.WRITE_BEHIND).
+    Known submission ids are skipped. Returns False if the write failed.
+    """
+    try:
+        if config.WRITE_BEHIND:
+            with timed('db.enqueue_results'):
+                write_queue = get_write_queue()
+                return all([write_queue.enqueue('results', row) for row in rows])
+        with timed('db.save_results_bulk'):
+            get_backend().save_results_bulk(rows)
+        notify_results_written()
+        return True
+    except Exception as e:
+        print(f"Error saving results: {e}")
+        return False
+
+def iter_results(page_size: int = 1000, since=None, until=None, professions=None):
+    """
+    Stream pages of results with user information, optionally filtered
+    by creation date and profession; errors propagate to the caller
+    """
+    pages = get_backend().iter_results(page_size=page_size, since=since, until=until, professions=professions)
+    while True:
+        # Time each page fetch, not the caller's work between pages
+        with timed('db.iter_results_page'):
+            page = next(pages, None)
+        if page is None:
+            return
+        yield page
+
+def get_aggregates(dimension: str = None) -> dict:
+    """
+    Pre-aggregated result statistics, {(dimension, key): RunningStats},
+    for dimensions in aggregates.AGGREGATE_DIMENSIONS
+    """
+    if dimension is not None and dimension not in AGGREGATE_DIMENSIONS:
+        raise ValueError(f"Unknown aggregate dimension '{dimension}'")
+    try:
+        with timed('db.get_aggregates'):
+            return _cached_read(('aggregates', dimension), lambda: get_backend().get_aggregates(dimension))
+    except Exception as e:
+        print(f"Error fetching aggregates: {e}")
+        return {}
+
+def get_all_results():
+    """Get all results with user information"""
+    try:
+        with timed('db.get_all_results'):
+            return _cached_read(('all_results',), lambda: get_backend().get_all_results())
+    except Exception as e:
+        print(f"Error fetching results: {e}")
+        return []
@@ -0,0 +1,158 @@
+# export.py
+import argparse
+import time
+
+from database import iter_results
+
+FORMATS = ('parquet', 'arrow', 'csv')
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise RuntimeError("Exporting results needs the pyarrow package (pip install pyarrow)") from e
+    return pyarrow
+
+
+def result_schema():
+    """Column types of an export; profession is dictionary-encoded, created_at is UTC"""
+    pa = _pyarrow()
+    return pa.schema([
+        ('id', pa.int64()),
+        ('email', pa.string()),
+        ('profession', pa.dictionary(pa.int32(), pa.string())),
+        ('analytical_score', pa.float64()),
+        ('communication_score', pa.float64()),
+        ('created_at', pa.timestamp('us')),
+    ])
+
+
+def _timestamps(values: tuple):
+    pa = _pyarrow()
+    strings = pa.array([None if v is None else str(v) for v in values], pa.string())
+    try:
+        return strings.cast(pa.timestamp('us'))
+    except pa.ArrowInvalid:
+        # Postgres timestamptz values carry an offset; normalise them to naive UTC
+        return strings.cast(pa.timestamp('us', tz='UTC')).cast(pa.timestamp('us'))
+
+
+def record_batches(page_size: int = 50000, since=None, until=None, professions=None):
+    """
+    Yield one Arrow record batch per backend page, so only a single page
+    is ever held in memory. The profession dictionary grows across batches
+    and each batch's indices refer to everything seen so far.
+    """
+    pa = _pyarrow()
+    schema = result_schema()
+    vocabulary = {}
+    for page in iter_results(page_size=page_size, since=since, until=until, professions=professions):
+        ids, emails, page_professions, analytical, communication, created_at = zip(*page)
+        indices = [vocabulary.setdefault(p, len(vocabulary)) for p in page_professions]
+        yield pa.RecordBatch.from_arrays([
+            pa.array(ids, pa.int64()),
+            pa.array(emails, pa.string()),
+            pa.DictionaryArray.from_arrays(pa.array(indices, pa.int32()), pa.array(list(vocabulary), pa.string())),
+            pa.array(analytical, pa.float64()),
+            pa.array(communication, pa.float64()),
+            _timestamps(created_at),
+        ], schema=schema)
+
+
+class _ParquetSink:
+    def __init__(self, path: str, schema):
+        import pyarrow.parquet as pq
+        self._writer = pq.ParquetWriter(path, schema, compression='zstd')
+
+    def write(self, batch):
+        self._writer.write_batch(batch)
+
+    def close(self):
+        self._writer.close()
+
+
+class _ArrowSink:
+    """Arrow IPC stream; dictionary deltas let the profession vocabulary grow between batches"""
+
+    def __init__(self, path: str, schema):
+        pa = _pyarrow()
+        self._file = pa.OSFile(path, 'wb')
+        self._writer = pa.ipc.new_stream(self._file, schema, options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True))
+
+    def write(self, batch):
+        self._writer.write_batch(batch)
+
+    def close(self):
+        self._writer.close()
+        self._file.close()
+
+
+class _CsvSink:
+    def __init__(self, path: str, schema):
+        import pyarrow.csv as csv
+        pa = _pyarrow()
+        # CSV has no dictionary type; write profession as plain text
+        self._profession = schema.get_field_index('profession')
+        self._schema = schema.set(self._profession, pa.field('profession', pa.string()))
+        self._writer = csv.CSVWriter(path, self._schema)
+
+    def write(self, batch):
+        pa = _pyarrow()
+        # RecordBatch.cast only exists from pyarrow 16, so cast the one column
+        columns = batch.columns
+        columns[self._profession] = columns[self._profession].cast(pa.string())
+        self._writer.write_batch(pa.RecordBatch.from_arrays(columns, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+SINKS = {'parquet': _ParquetSink, 'arrow': _ArrowSink, 'csv': _CsvSink}
+
+
+def export_results(path: str, fmt: str = 'parquet', page_size: int = 50000,
+                   since=None, until=None, professions=None) -> int:
+    """
+    Stream results (joined with their user) into a Parquet, Arrow IPC
+    stream or CSV file, one page at a time; returns the rows written.
+    Date and profession filters are applied by the backend query.
+    """
+    if fmt not in SINKS:
+        raise ValueError(f"Unknown export format '{fmt}', expected one of {FORMATS}")
+    sink = SINKS[fmt](path, result_schema())
+    rows = 0
+    started = time.monotonic()
+    try:
+        for batch in record_batches(page_size, since, until, professions):
+            sink.write(batch)
+            rows += batch.num_rows
+            elapsed = time.monotonic() - started
+            print(f"\rExported {rows} rows ({rows / max(elapsed, 1e-9):.0f} rows/s)", end='')
+    finally:
+        sink.close()
+    print()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export results with user details to Parquet, Arrow or CSV")
+    parser.add_argument('output', help="file to write")
+    parser.add_argument('--format', choices=FORMATS, help="default: from the output extension, else parquet")
+    parser.add_argument('--since', help="only results created on or after this date (YYYY-MM-DD)")
+    parser.add_argument('--until', help="only results created before this date (YYYY-MM-DD)")
+    parser.add_argument('--profession', action='append', dest='professions',
+                        help="only results from this profession (repeatable)")
+    parser.add_argument('--page-size', type=int, default=50000, help="rows per backend page and record batch")
+    args = parser.parse_args()
+
+    fmt = args.format
+    if fmt is None:
+        extension = args.output.rsplit('.', 1)[-1].lower()
+        fmt = {'arrow': 'arrow', 'arrows': 'arrow', 'csv': 'csv'}.get(extension, 'parquet')
+    rows = export_results(args.output, fmt, args.page_size, args.since, args.until, args.professions)
+    print(f"Wrote {rows} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
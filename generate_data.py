@@ -0,0 +1,163 @@
+# generate_data.py
+import argparse
+import time
+from datetime import datetime, timedelta
+from multiprocessing import Pool
+
+import numpy as np
+
+from database import SQLiteBackend, create_backend
+from scoring import SCORING, pack_answers
+
+# Registration choices, with rough shares of respondents
+PROFESSIONS = ("Data Analyst", "Data Scientist", "Business Analyst", "Student", "Other")
+PROFESSION_WEIGHTS = (0.35, 0.2, 0.2, 0.15, 0.1)
+# Reserved (RFC 2606) domains, so generated addresses never reach a real mailbox
+EMAIL_DOMAINS = ("example.com", "example.org", "example.net")
+# How strongly a respondent's skills steer their answers; 0 picks options uniformly
+ANSWER_SHARPNESS = 4.0
+
+
+def generate_chunk(seed: int, chunk: int, first_user_id: int, users: int,
+                   results_per_user: float, end: datetime, days: int) -> dict:
+    """
+    Users and results for one chunk, as column arrays. Each respondent
+    gets a latent skill per dimension and picks options with probability
+    rising with how well their weights match it, so scores cluster the
+    way real cohorts do. The arrays depend only on the arguments.
+    """
+    rng = np.random.default_rng([seed, chunk])
+    user_ids = np.arange(first_user_id, first_user_id + users)
+    professions = rng.choice(len(PROFESSIONS), size=users, p=PROFESSION_WEIGHTS)
+    domains = rng.integers(0, len(EMAIL_DOMAINS), size=users)
+    joined = np.datetime64(end, 'us') - rng.integers(0, days * 86400 * 10 ** 6, size=users).astype('timedelta64[us]')
+
+    # Attempts per user: at least one, more for some returning users
+    attempts = 1 + rng.poisson(max(results_per_user - 1.0, 0.0), size=users)
+    owner = np.repeat(np.arange(users), attempts)
+    skills = rng.normal(size=(users, 2))[owner]
+
+    # Gumbel-max sampling from a softmax over each question's options;
+    # questions with fewer options mask the padding out
+    logits = ANSWER_SHARPNESS * np.einsum('nd,qod->nqo', skills, SCORING.weights)
+    logits[:, np.arange(SCORING.n_options) >= SCORING.option_counts[:, np.newaxis]] = -np.inf
+    answers = np.argmax(logits + rng.gumbel(size=logits.shape), axis=2)
+    scores = SCORING.score_batch(answers)
+
+    # Results are completed within a day of registering, in order
+    completed = joined[owner] + rng.integers(60, 86400, size=len(owner)).astype('timedelta64[s]')
+    submission_ids = rng.bytes(16 * len(owner))
+
+    return {
+        'user_ids': user_ids,
+        'professions': professions,
+        'domains': domains,
+        'joined': joined,
+        'owner': owner,
+        'answers': answers.astype(np.uint8),
+        'scores': scores,
+        'completed': completed,
+        'submission_ids': submission_ids,
+    }
+
+
+def chunk_rows(chunk: dict) -> tuple:
+    """Row dicts for StorageBackend.load_bulk from the arrays of generate_chunk"""
+    user_ids = chunk['user_ids'].tolist()
+    user_rows = [{
+        'id': user_id,
+        'email': f"user{user_id}@{EMAIL_DOMAINS[domain]}",
+        'profession': PROFESSIONS[profession],
+        'created_at': created_at,
+    } for user_id, domain, profession, created_at in zip(
+        user_ids, chunk['domains'].tolist(), chunk['professions'].tolist(),
+        np.datetime_as_string(chunk['joined'], unit='us').tolist()
+    )]
+    submission_ids = chunk['submission_ids']
+    result_rows = [{
+        'user_id': user_ids[i],
+        'analytical_score': analytical,
+        'communication_score': communication,
+        'created_at': created_at,
+        'submission_id': submission_ids[16 * n:16 * n + 16].hex(),
+        'answers': answers,
+        'bank_version': SCORING.version,
+    } for n, (i, (analytical, communication), created_at, answers) in enumerate(zip(
+        chunk['owner'].tolist(), chunk['scores'].tolist(),
+        np.datetime_as_string(chunk['completed'], unit='us').tolist(),
+        [pack_answers(row) for row in chunk['answers']]
+    ))]
+    return user_rows, result_rows
+
+
+def _generate_chunk(args):
+    return generate_chunk(*args)
+
+
+def generate_data(backend, users: int, results_per_user: float = 1.2, seed: int = 0,
+                  chunk_size: int = 20000, workers: int = 1, end: datetime = None, days: int = 365) -> tuple:
+    """
+    Fill backend with users synthetic users and their results, one
+    transaction per chunk of chunk_size users. With workers > 1, chunks
+    are sampled and scored in worker processes while this process writes
+    earlier ones, in order, so the output is the same for a given seed,
+    chunk size, end date and starting user id whatever the number of
+    workers. Returns (users, results) written.
+    """
+    backend.init_db()
+    end = end or datetime.combine(datetime.now().date(), datetime.min.time())
+    first_user_id = backend.max_user_id() + 1
+    tasks = [
+        (seed, chunk, first_user_id + start, min(chunk_size, users - start), results_per_user, end, days)
+        for chunk, start in enumerate(range(0, users, chunk_size))
+    ]
+
+    written_users = written_results = 0
+    started = time.monotonic()
+    pool = Pool(workers) if workers > 1 else None
+    try:
+        chunks = pool.imap(_generate_chunk, tasks) if pool else map(_generate_chunk, tasks)
+        for chunk in chunks:
+            user_rows, result_rows = chunk_rows(chunk)
+            backend.load_bulk(user_rows, result_rows)
+            written_users += len(user_rows)
+            written_results += len(result_rows)
+            elapsed = time.monotonic() - started
+            print(f"\rWrote {written_users} users, {written_results} results "
+                  f"({written_results / max(elapsed, 1e-9):.0f} results/s)", end='')
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+    print()
+
+    if written_results:
+        backend.rebuild_aggregates()
+    return written_users, written_results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill the database with synthetic users and results")
+    parser.add_argument('--users', type=int, default=100000, help="users to create")
+    parser.add_argument('--results-per-user', type=float, default=1.2, help="mean results per user (at least 1)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=20000, help="users generated and written per transaction")
+    parser.add_argument('--workers', type=int, default=1, help="processes generating chunks")
+    parser.add_argument('--days', type=int, default=365, help="spread registrations over this many days")
+    parser.add_argument('--end', help="latest registration date (YYYY-MM-DD); default: today")
+    parser.add_argument('--backend', help="storage backend (default: STORAGE_BACKEND)")
+    parser.add_argument('--database', help="SQLite file to fill (implies the sqlite backend)")
+    args = parser.parse_args()
+
+    backend = SQLiteBackend(path=args.database) if args.database else create_backend(args.backend)
+    end = datetime.fromisoformat(args.end) if args.end else None
+    started = time.monotonic()
+    users, results = generate_data(
+        backend, args.users, args.results_per_user, args.seed,
+        args.chunk_size, args.workers, end, args.days
+    )
+    print(f"Done: {users} users and {results} results in {timedelta(seconds=round(time.monotonic() - started))}")
+
+
+if __name__ == "__main__":
+    main()
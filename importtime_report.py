@@ -0,0 +1,75 @@
+# importtime_report.py
+import argparse
+import json
+import subprocess
+import sys
+
+
+def measure_imports(module: str) -> list:
+    """
+    Import module in a fresh interpreter with -X importtime and return
+    (name, self_us, cumulative_us, depth) for every module it loaded.
+    """
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr}")
+
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def report(module: str, top: int = 20) -> dict:
+    entries = measure_imports(module)
+    # Children are printed before their parent: the measured module's direct
+    # imports are the depth-1 lines since the previous top-level import
+    end = max(i for i, e in enumerate(entries) if e[0] == module and e[3] == 0)
+    start = max((i for i, e in enumerate(entries[:end]) if e[3] == 0), default=-1) + 1
+    direct = [e for e in entries[start:end] if e[3] == 1]
+    total = entries[end][2]
+    return {
+        'module': module,
+        'total_ms': total / 1000,
+        'modules_loaded': len(entries),
+        'direct_imports': [
+            {'module': name, 'cumulative_ms': cumulative / 1000}
+            for name, _, cumulative, _ in sorted(direct, key=lambda e: -e[2])[:top]
+        ],
+        'slowest_self': [
+            {'module': name, 'self_ms': self_us / 1000}
+            for name, self_us, _, _ in sorted(entries, key=lambda e: -e[1])[:top]
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show where a module's import time goes")
+    parser.add_argument('module', nargs='?', default='app', help="module to import (default: app)")
+    parser.add_argument('--top', type=int, default=15, help="rows per table")
+    parser.add_argument('--json', action='store_true', help="print machine-readable JSON")
+    args = parser.parse_args()
+
+    result = report(args.module, args.top)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"import {result['module']}: {result['total_ms']:.0f} ms, {result['modules_loaded']} modules")
+    print("\nDirect imports by cumulative time:")
+    for entry in result['direct_imports']:
+        print(f"  {entry['cumulative_ms']:8.1f} ms  {entry['module']}")
+    print("\nModules by self time:")
+    for entry in result['slowest_self']:
+        print(f"  {entry['self_ms']:8.1f} ms  {entry['module']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+# metrics.py
+import json
+import os
+import random
+import threading
+import time
+from functools import wraps
+
+import config
+
+# cProfile, pstats and http.server are imported where used: this module is
+# on the app's startup path through database and only needs them when
+# profiling or serving metrics
+
+# Upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class LatencyHistogram:
+    """Cumulative-bucket latency histogram with call and error counts, as Prometheus expects"""
+
+    __slots__ = ('buckets', 'counts', 'count', 'total', 'errors', '_lock')
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, error: bool = False):
+        with self._lock:
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    self.counts[i] += 1
+                    break
+            self.count += 1
+            self.total += seconds
+            if error:
+                self.errors += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            cumulative, buckets = 0, {}
+            for bound, count in zip(self.buckets, self.counts):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            return {
+                'count': self.count,
+                'sum_seconds': self.total,
+                'errors': self.errors,
+                'error_rate': self.errors / self.count if self.count else 0.0,
+                'buckets': buckets,
+            }
+
+
+class MetricsRegistry:
+    """Latency histograms by operation name, plus cProfile samples of those operations"""
+
+    def __init__(self, profile_sample_rate: float = 0.0):
+        self.profile_sample_rate = profile_sample_rate
+        self._histograms = {}
+        self._profiles = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, LatencyHistogram())
+        return histogram
+
+    def start_profile(self):
+        """A running cProfile.Profile for a sampled call, or None"""
+        # cProfile allows one active profiler per thread, so nested operations are not sampled
+        if not self.profile_sample_rate or getattr(self._local, 'profiling', False):
+            return None
+        if random.random() >= self.profile_sample_rate:
+            return None
+        import cProfile
+        profiler = cProfile.Profile()
+        self._local.profiling = True
+        profiler.enable()
+        return profiler
+
+    def finish_profile(self, name: str, profiler):
+        import pstats
+        profiler.disable()
+        self._local.profiling = False
+        with self._lock:
+            stats = self._profiles.get(name)
+            if stats is None:
+                self._profiles[name] = pstats.Stats(profiler)
+            else:
+                stats.add(profiler)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {name: histogram.snapshot() for name, histogram in sorted(histograms.items())}
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        lines = [
+            '# HELP app_operation_seconds Latency of instrumented operations',
+            '# TYPE app_operation_seconds histogram',
+        ]
+        snapshot = self.snapshot()
+        for name, data in snapshot.items():
+            for bound, count in data['buckets'].items():
+                lines.append(f'app_operation_seconds_bucket{{operation="{name}",le="{bound}"}} {count}')
+            lines.append(f'app_operation_seconds_bucket{{operation="{name}",le="+Inf"}} {data["count"]}')
+            lines.append(f'app_operation_seconds_sum{{operation="{name}"}} {data["sum_seconds"]}')
+            lines.append(f'app_operation_seconds_count{{operation="{name}"}} {data["count"]}')
+        lines.append('# HELP app_operation_errors_total Instrumented operations that raised')
+        lines.append('# TYPE app_operation_errors_total counter')
+        for name, data in snapshot.items():
+            lines.append(f'app_operation_errors_total{{operation="{name}"}} {data["errors"]}')
+        return '\n'.join(lines) + '\n'
+
+    def dump_json(self, path: str):
+        """Write the snapshot to path atomically"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'time': time.time(), 'operations': self.snapshot()}, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def dump_profiles(self, directory: str):
+        """Write the merged cProfile samples of each operation to <directory>/<operation>.prof"""
+        with self._lock:
+            profiles = dict(self._profiles)
+            os.makedirs(directory, exist_ok=True)
+            for name, stats in profiles.items():
+                stats.dump_stats(os.path.join(directory, f"{name}.prof"))
+
+
+REGISTRY = MetricsRegistry(profile_sample_rate=config.PROFILE_SAMPLE_RATE)
+
+
+class timed:
+    """
+    Record the latency of a block or function under name, as a context
+    manager or a decorator. Exceptions count as errors and propagate;
+    BaseExceptions that are not Exceptions (such as Streamlit's rerun
+    signal) are timed but not counted. A no-op unless config.METRICS.
+    """
+
+    __slots__ = ('name', '_started', '_profiler')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self._profiler = REGISTRY.start_profile() if config.METRICS else None
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if config.METRICS:
+            elapsed = time.perf_counter() - self._started
+            REGISTRY.histogram(self.name).observe(
+                elapsed, error=exc_type is not None and issubclass(exc_type, Exception)
+            )
+            if self._profiler is not None:
+                REGISTRY.finish_profile(self.name, self._profiler)
+        return False
+
+    def __call__(self, fn):
+        name = self.name
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not config.METRICS:
+                return fn(*args, **kwargs)
+            with timed(name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+def _metrics_handler():
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/metrics':
+                body, content_type = REGISTRY.render_prometheus(), 'text/plain; version=0.0.4'
+            elif self.path == '/metrics.json':
+                body, content_type = json.dumps(REGISTRY.snapshot()), 'application/json'
+            else:
+                self.send_error(404)
+                return
+            data = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
+
+
+def start_http_server(port: int, host: str = '0.0.0.0'):
+    """Serve /metrics (Prometheus text) and /metrics.json from a daemon thread"""
+    from http.server import ThreadingHTTPServer
+    server = ThreadingHTTPServer((host, port), _metrics_handler())
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def start_json_dump(path: str, interval: float, profile_dir: str = None) -> threading.Thread:
+    """Rewrite the JSON snapshot (and any profiles) every interval seconds from a daemon thread"""
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                REGISTRY.dump_json(path)
+                if profile_dir:
+                    REGISTRY.dump_profiles(profile_dir)
+            except Exception as e:
+                print(f"Error writing metrics: {e}")
+
+    thread = threading.Thread(target=run, name="metrics-dump", daemon=True)
+    thread.start()
+    return thread
+
+
+_exporters_started = False
+_exporters_lock = threading.Lock()
+
+
+def start_exporters():
+    """Start the configured exporters once per process; safe to call on every rerun"""
+    global _exporters_started
+    if not config.METRICS or _exporters_started:
+        return
+    with _exporters_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+        try:
+            if config.METRICS_PORT:
+                start_http_server(config.METRICS_PORT)
+            if config.METRICS_JSON_PATH:
+                profile_dir = config.PROFILE_DIR if config.PROFILE_SAMPLE_RATE else None
+                start_json_dump(config.METRICS_JSON_PATH, config.METRICS_JSON_INTERVAL, profile_dir)
+        except Exception as e:
+            print(f"Error starting metrics exporters: {e}")
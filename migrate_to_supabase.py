@@ -1,60 +1,249 @@
-# migrate_to_supabase.py
-import sqlite3
-from database import supabase
-from pathlib import Path
-
-def migrate_data():
-    """Migrate data from SQLite to Supabase"""
-    # Connect to SQLite database
-    sqlite_db = Path(__file__).parent / 'data' / 'assessment.db'
-    
-    if not sqlite_db.exists():
-        print("No SQLite database found to migrate")
-        return
-    
-    conn = sqlite3.connect(sqlite_db)
-    c = conn.cursor()
-    
-    try:
-        # Migrate users
-        c.execute("SELECT * FROM users")
-        users = c.fetchall()
-        
-        for user in users:
-            user_id, email, profession, created_at = user
-            
-            # Insert into Supabase
-            supabase.table('users').insert({
-                'id': user_id,
-                'email': email,
-                'profession': profession,
-                'created_at': created_at
-            }).execute()
-        
-        print(f"Migrated {len(users)} users")
-        
-        # Migrate results
-        c.execute("SELECT * FROM results")
-        results = c.fetchall()
-        
-        for result in results:
-            result_id, user_id, analytical_score, communication_score, created_at = result
-            
-            # Insert into Supabase
-            supabase.table('results').insert({
-                'id': result_id,
-                'user_id': user_id,
-                'analytical_score': analytical_score,
-                'communication_score': communication_score,
-                'created_at': created_at
-            }).execute()
-        
-        print(f"Migrated {len(results)} results")
-        
-    except Exception as e:
-        print(f"Error during migration: {e}")
-    finally:
-        conn.close()
-
-if __name__ == "__main__":
-    migrate_data()
\ No newline at end of file
+# migrate_to_supabase.py
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from database import SupabaseBackend
+
+DEFAULT_SOURCE = Path(__file__).parent / 'data' / 'assessment.db'
+
+# Source column -> Supabase column, per table, in migration order (users
+# first for the foreign key). Optional columns only exist in databases
+# created by newer versions of the app.
+TABLES = {
+    'users': {
+        'columns': {'id': 'id', 'email': 'email', 'profession': 'profession', 'created_at': 'created_at'},
+        'optional': {},
+    },
+    'results': {
+        'columns': {
+            'id': 'id',
+            'user_id': 'user_id',
+            'analytical_score': 'analytical_score',
+            'communication_score': 'communication_score',
+            'completed_at': 'created_at',
+        },
+        'optional': {'submission_id': 'submission_id', 'answers': 'answers', 'bank_version': 'bank_version'},
+    },
+}
+
+
+class Checkpoint:
+    """
+    Last migrated id per table, persisted as JSON. Chunks can finish out
+    of order, so the stored id only advances past a chunk once every
+    earlier chunk has finished too.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pending = {}
+        self.last_ids = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.last_ids = json.load(f)
+
+    def last_id(self, table: str) -> int:
+        return self.last_ids.get(table, 0)
+
+    def start(self, table: str, chunk_last_id: int):
+        with self._lock:
+            self._pending.setdefault(table, {})[chunk_last_id] = False
+
+    def finish(self, table: str, chunk_last_id: int):
+        with self._lock:
+            pending = self._pending[table]
+            pending[chunk_last_id] = True
+            advanced = False
+            for last_id in sorted(pending):
+                if not pending[last_id]:
+                    break
+                del pending[last_id]
+                self.last_ids[table] = last_id
+                advanced = True
+            if advanced:
+                self._save()
+
+    def _save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.last_ids, f)
+        os.replace(tmp_path, self.path)
+
+
+class Migrator:
+    """Stream SQLite tables into Supabase as chunked, concurrent bulk upserts"""
+
+    def __init__(self, source: str, checkpoint: Checkpoint, chunk_size: int = 1000, workers: int = 4,
+                 retries: int = 3, client_factory=lambda: SupabaseBackend().client,
+                 drop_invalid_emails: bool = False):
+        self.source = source
+        self.checkpoint = checkpoint
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.retries = retries
+        self.drop_invalid_emails = drop_invalid_emails
+        self._client_factory = client_factory
+        self._local = threading.local()
+        self._dropped_users = set()
+
+    def _client(self):
+        # One client per worker thread
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self._client_factory()
+        return client
+
+    def _upsert(self, table: str, rows: list):
+        for attempt in range(self.retries + 1):
+            try:
+                self._client().table(table).upsert(rows, on_conflict='id').execute()
+                return
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                time.sleep(2 ** attempt)
+
+    def _select(self, conn: sqlite3.Connection, table: str):
+        spec = TABLES[table]
+        available = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        mapping = dict(spec['columns'])
+        mapping.update({src: dst for src, dst in spec['optional'].items() if src in available})
+        sql = f"SELECT {', '.join(mapping)} FROM {table} WHERE id > ? ORDER BY id"
+        return sql, list(mapping.values())
+
+    def find_invalid_users(self, conn: sqlite3.Connection) -> dict:
+        """
+        Validate every user's email in bulk, remembering the ids to leave
+        out (with their results); returns the count per failing reason
+        """
+        from validation import validate_emails
+
+        counts = {}
+        cursor = conn.execute("SELECT id, email FROM users ORDER BY id")
+        while True:
+            chunk = cursor.fetchmany(100000)
+            if not chunk:
+                break
+            ids, emails = zip(*chunk)
+            reasons = validate_emails(list(emails)).to_numpy()
+            for user_id, reason in zip(ids, reasons):
+                if reason != 'ok':
+                    self._dropped_users.add(user_id)
+                    counts[reason] = counts.get(reason, 0) + 1
+        return counts
+
+    def _keep(self, table: str, rows: list) -> list:
+        if not self._dropped_users:
+            return rows
+        column = 'id' if table == 'users' else 'user_id'
+        return [row for row in rows if row[column] not in self._dropped_users]
+
+    def migrate_table(self, conn: sqlite3.Connection, table: str) -> int:
+        sql, columns = self._select(conn, table)
+        cursor = conn.execute(sql, (self.checkpoint.last_id(table),))
+        # Bound in-flight chunks so memory stays flat however large the table is
+        in_flight = threading.BoundedSemaphore(self.workers * 2)
+        errors = []
+        migrated = 0
+        started = time.monotonic()
+
+        def send(rows, last_id):
+            try:
+                if not errors:
+                    if rows:
+                        self._upsert(table, rows)
+                    self.checkpoint.finish(table, last_id)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                in_flight.release()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while not errors:
+                chunk = cursor.fetchmany(self.chunk_size)
+                if not chunk:
+                    break
+                rows = [_row(columns, values) for values in chunk]
+                # The checkpoint advances past filtered-out rows too
+                last_id = rows[-1]['id']
+                rows = self._keep(table, rows)
+                in_flight.acquire()
+                self.checkpoint.start(table, last_id)
+                pool.submit(send, rows, last_id)
+                migrated += len(rows)
+                elapsed = time.monotonic() - started
+                print(f"\r{table}: {migrated} rows sent ({migrated / max(elapsed, 1e-9):.0f} rows/s)", end='')
+        print()
+
+        if errors:
+            raise RuntimeError(
+                f"Migration of {table} stopped after {self.checkpoint.last_id(table)}: {errors[0]}. "
+                "Re-run to resume from the checkpoint."
+            )
+        return migrated
+
+    def run(self):
+        conn = sqlite3.connect(self.source)
+        try:
+            if self.drop_invalid_emails:
+                dropped = self.find_invalid_users(conn)
+                print(f"Leaving out {len(self._dropped_users)} users with unusable emails and their results: {dropped}")
+            for table in TABLES:
+                migrated = self.migrate_table(conn, table)
+                print(f"Migrated {migrated} {table}")
+        finally:
+            conn.close()
+
+
+def _row(columns: list, values: tuple) -> dict:
+    row = dict(zip(columns, values))
+    if isinstance(row.get('answers'), bytes):
+        row['answers'] = '\\x' + row['answers'].hex()
+    return row
+
+
+def migrate_data(source=DEFAULT_SOURCE, chunk_size: int = 1000, workers: int = 4,
+                 checkpoint_path: str = None, reset: bool = False, drop_invalid_emails: bool = False):
+    """Migrate data from SQLite to Supabase"""
+    source = Path(source)
+    if not source.exists():
+        print("No SQLite database found to migrate")
+        return
+
+    checkpoint_path = checkpoint_path or f"{source}.migration.json"
+    if reset and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    checkpoint = Checkpoint(checkpoint_path)
+    try:
+        Migrator(
+            str(source), checkpoint, chunk_size=chunk_size, workers=workers,
+            drop_invalid_emails=drop_invalid_emails
+        ).run()
+    except Exception as e:
+        print(f"Error during migration: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy users and results from SQLite into Supabase")
+    parser.add_argument('--source', default=DEFAULT_SOURCE, help="SQLite database to read")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="rows per bulk upsert")
+    parser.add_argument('--workers', type=int, default=4, help="concurrent upload threads")
+    parser.add_argument('--checkpoint', help="checkpoint file (default: <source>.migration.json)")
+    parser.add_argument('--reset', action='store_true', help="ignore any checkpoint and start over")
+    parser.add_argument('--drop-invalid-emails', action='store_true',
+                        help="leave out users with malformed, reserved or disposable emails, and their results")
+    args = parser.parse_args()
+
+    migrate_data(args.source, args.chunk_size, args.workers, args.checkpoint, args.reset, args.drop_invalid_emails)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+-- Idempotent result submissions: one row per completed assessment attempt
+ALTER TABLE results ADD COLUMN IF NOT EXISTS submission_id TEXT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_results_submission_id
+    ON results (submission_id);
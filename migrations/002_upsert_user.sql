@@ -0,0 +1,10 @@
+-- Single round-trip registration: returns the id of the new or existing user
+CREATE OR REPLACE FUNCTION upsert_user(p_email TEXT, p_profession TEXT)
+RETURNS BIGINT
+LANGUAGE sql
+AS $$
+    INSERT INTO users (email, profession, created_at)
+    VALUES (p_email, p_profession, now())
+    ON CONFLICT (email) DO UPDATE SET email = EXCLUDED.email
+    RETURNING id;
+$$;
@@ -0,0 +1,18 @@
+-- Raw per-question option indices (one byte each) and the question bank
+-- version they were scored against, so results can be re-scored later
+ALTER TABLE results ADD COLUMN IF NOT EXISTS answers BYTEA;
+ALTER TABLE results ADD COLUMN IF NOT EXISTS bank_version TEXT;
+
+-- Bulk score updates for rescore.py in a single call
+CREATE OR REPLACE FUNCTION update_result_scores(p_rows JSONB)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    UPDATE results r
+    SET analytical_score = u.analytical_score,
+        communication_score = u.communication_score,
+        bank_version = u.bank_version
+    FROM jsonb_to_recordset(p_rows)
+        AS u(id BIGINT, analytical_score DOUBLE PRECISION, communication_score DOUBLE PRECISION, bank_version TEXT)
+    WHERE r.id = u.id;
+$$;
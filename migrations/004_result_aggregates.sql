@@ -0,0 +1,89 @@
+-- Incrementally maintained result statistics for dashboards.
+-- Each row holds count, mean and M2 (sum of squared deviations) of both
+-- scores for one (dimension, key): all, profile, profession, day and the
+-- 20-bin score histograms.
+CREATE TABLE IF NOT EXISTS result_aggregates (
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    count BIGINT NOT NULL,
+    analytical_mean DOUBLE PRECISION NOT NULL,
+    analytical_m2 DOUBLE PRECISION NOT NULL,
+    communication_mean DOUBLE PRECISION NOT NULL,
+    communication_m2 DOUBLE PRECISION NOT NULL,
+    PRIMARY KEY (dimension, key)
+);
+
+CREATE OR REPLACE FUNCTION result_aggregate_keys(p_profession TEXT, p_analytical DOUBLE PRECISION,
+                                                 p_communication DOUBLE PRECISION, p_created_at TEXT)
+RETURNS TABLE (dimension TEXT, key TEXT)
+LANGUAGE sql IMMUTABLE
+AS $$
+    VALUES
+        ('all', ''),
+        ('profile', CASE
+            WHEN p_analytical >= 0.5 AND p_communication >= 0.5 THEN 'Strategic Communicator'
+            WHEN p_analytical >= 0.5 THEN 'Technical Expert'
+            WHEN p_communication >= 0.5 THEN 'Storyteller'
+            ELSE 'Intuitive Analyst'
+        END),
+        ('profession', COALESCE(p_profession, '')),
+        ('day', left(p_created_at, 10)),
+        ('analytical_bin', to_char(LEAST(floor(p_analytical * 20), 19) / 20.0, 'FM0.00')),
+        ('communication_bin', to_char(LEAST(floor(p_communication * 20), 19) / 20.0, 'FM0.00'));
+$$;
+
+-- Welford update for a single new result
+CREATE OR REPLACE FUNCTION results_aggregate_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_profession TEXT;
+BEGIN
+    SELECT profession INTO v_profession FROM users WHERE id = NEW.user_id;
+
+    INSERT INTO result_aggregates AS a
+    SELECT k.dimension, k.key, 1, NEW.analytical_score, 0, NEW.communication_score, 0
+    FROM result_aggregate_keys(
+        v_profession, NEW.analytical_score, NEW.communication_score, NEW.created_at::TEXT
+    ) k
+    ON CONFLICT (dimension, key) DO UPDATE SET
+        count = a.count + 1,
+        analytical_mean = a.analytical_mean
+            + (EXCLUDED.analytical_mean - a.analytical_mean) / (a.count + 1),
+        analytical_m2 = a.analytical_m2
+            + (EXCLUDED.analytical_mean - a.analytical_mean)
+            * (EXCLUDED.analytical_mean - a.analytical_mean) * a.count / (a.count + 1),
+        communication_mean = a.communication_mean
+            + (EXCLUDED.communication_mean - a.communication_mean) / (a.count + 1),
+        communication_m2 = a.communication_m2
+            + (EXCLUDED.communication_mean - a.communication_mean)
+            * (EXCLUDED.communication_mean - a.communication_mean) * a.count / (a.count + 1);
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS results_aggregate ON results;
+CREATE TRIGGER results_aggregate
+    AFTER INSERT ON results
+    FOR EACH ROW EXECUTE FUNCTION results_aggregate_trigger();
+
+-- Full recompute, used after bulk score updates (rescore.py) and for backfill
+CREATE OR REPLACE FUNCTION rebuild_result_aggregates()
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    DELETE FROM result_aggregates;
+    INSERT INTO result_aggregates
+    SELECT k.dimension, k.key, count(*),
+           avg(r.analytical_score), var_pop(r.analytical_score) * count(*),
+           avg(r.communication_score), var_pop(r.communication_score) * count(*)
+    FROM results r
+    LEFT JOIN users u ON u.id = r.user_id
+    CROSS JOIN LATERAL result_aggregate_keys(
+        u.profession, r.analytical_score, r.communication_score, r.created_at::TEXT
+    ) k
+    GROUP BY k.dimension, k.key;
+$$;
+
+SELECT rebuild_result_aggregates();
@@ -0,0 +1,99 @@
+# pages/1_Admin.py
+import hmac
+
+import pandas as pd
+import streamlit as st
+
+import config
+from database import clear_reads, init_db
+from reporting import AggregateSummary, summarize_results
+
+st.set_page_config(page_title="Assessment Admin", layout="wide")
+
+
+@st.cache_data(ttl=60, show_spinner="Loading results...")
+def load_summary():
+    summary = AggregateSummary()
+    return (
+        summary.total,
+        summary.profiles(),
+        summary.professions(),
+        summary.histograms(),
+        summary.days(),
+        summary.profession_scores(),
+    )
+
+
+def main():
+    st.title("Assessment Results Dashboard")
+    # The admin page may be the first one a process serves
+    init_db()
+
+    if not st.session_state.get('admin_authenticated'):
+        if config.ADMIN_PASSWORD in ('', config.DEFAULT_ADMIN_PASSWORD):
+            st.error("The admin dashboard is disabled: set ADMIN_PASSWORD to a password of your own.")
+            st.stop()
+        with st.form("admin_login"):
+            password = st.text_input("Admin password", type="password")
+            if st.form_submit_button("Sign in"):
+                if hmac.compare_digest(password.encode(), config.ADMIN_PASSWORD.encode()):
+                    st.session_state.admin_authenticated = True
+                    st.rerun()
+                else:
+                    st.error("Incorrect password")
+        st.stop()
+
+    try:
+        total, profiles, professions, histograms, days, profession_scores = load_summary()
+    except Exception as e:
+        print(f"Error loading dashboard: {e}")
+        st.error("Could not load results. Please try again later.")
+        st.stop()
+
+    st.metric("Completed assessments", f"{total:,}")
+    if st.button("Refresh"):
+        load_summary.clear()
+        clear_reads()
+        st.rerun()
+
+    col1, col2 = st.columns(2)
+    col1.markdown("### Profiles")
+    col1.bar_chart(profiles)
+    col2.markdown("### Professions")
+    col2.bar_chart(professions)
+
+    st.markdown("### Score Distribution")
+    st.bar_chart(histograms, stack=False)
+
+    st.markdown("### Scores by Profession")
+    st.dataframe(profession_scores, use_container_width=True)
+
+    st.markdown("### Assessments per Day")
+    st.line_chart(days)
+
+    st.markdown("### Check Against Raw Results")
+    st.caption("Streams every result a page at a time and recounts the profiles, so memory stays flat however many there are.")
+    if st.button("Rescan results"):
+        try:
+            with st.spinner("Scanning results..."):
+                scanned = summarize_results()
+        except Exception as e:
+            print(f"Error scanning results: {e}")
+            st.error("Could not scan results. Please try again later.")
+        else:
+            st.metric("Results scanned", f"{scanned.total:,}", delta=scanned.total - total)
+            st.dataframe(pd.DataFrame({'Aggregates': profiles, 'Scan': scanned.profiles()}), use_container_width=True)
+
+    st.markdown("### Population Map")
+    from percentiles import get_percentile_service
+    from plots import create_population_plot
+    service = get_percentile_service()
+    group = st.selectbox("Profession", [''] + service.groups(), format_func=lambda g: g or "All professions")
+    density = service.density(group)
+    if density is None:
+        st.info("Not enough results yet.")
+    else:
+        st.plotly_chart(create_population_plot(density, group or "All respondents"), use_container_width=True)
+
+
+main()
@@ -0,0 +1,266 @@
+# percentiles.py
+import os
+import threading
+import time
+
+import numpy as np
+
+import config
+import database
+from question_bank import get_question_bank
+
+# Score histogram resolution; finer than any question bank's distinct scores
+PERCENTILE_BINS = 1000
+# Cells per axis of the joint (analytical, communication) population grid
+DENSITY_BINS = 40
+# Ids this far behind last_id are read again on catch-up, since Postgres ids
+# can commit out of order; ids already folded in are remembered and skipped
+TAIL_WINDOW = 1000
+# Group key of the sketch covering every profession
+ALL = ''
+
+
+class PercentileSketch:
+    """
+    Fixed-bin histograms of both scores, overall and per profession,
+    plus a coarser 2-D grid of both scores together for density plots.
+    Rows are folded in as they arrive; a lookup reads a cached cumulative
+    sum, so it is O(1) whatever the number of results. last_id is the
+    highest result id folded in; catching up reads from TAIL_WINDOW ids
+    before it, skipping the ids in recent that were already counted.
+    source is the identity of the backend the rows came from.
+    """
+
+    def __init__(self, bins: int = PERCENTILE_BINS, version: str = None, density_bins: int = DENSITY_BINS,
+                 source: str = None):
+        self.bins = bins
+        self.density_bins = density_bins
+        self.version = version
+        self.source = source
+        self.last_id = 0
+        self.recent = set()
+        self.groups = {}
+        self.grids = {}
+        self._cumulative = {}
+        self._lock = threading.Lock()
+
+    def add_rows(self, rows):
+        """Fold in (id, email, profession, analytical_score, communication_score, created_at) rows"""
+        with self._lock:
+            floor = self.last_id - TAIL_WINDOW
+            rows = [r for r in rows if r[0] > floor and r[0] not in self.recent]
+            if not rows:
+                return
+            ids, _, professions, analytical, communication, _ = zip(*rows)
+            scores = np.array([analytical, communication], dtype=np.float64)
+            bins = np.clip((scores * self.bins).astype(np.intp), 0, self.bins - 1)
+            cell_bins = np.clip((scores * self.density_bins).astype(np.intp), 0, self.density_bins - 1)
+            cells = cell_bins[0] * self.density_bins + cell_bins[1]
+            professions = np.array([p or '' for p in professions], dtype=object)
+            self._add(ALL, bins, cells)
+            for profession in set(professions):
+                mask = professions == profession
+                self._add(profession, bins[:, mask], cells[mask])
+            self.last_id = max(self.last_id, max(ids))
+            floor = self.last_id - TAIL_WINDOW
+            self.recent = {i for i in self.recent if i > floor}
+            self.recent.update(i for i in ids if i > floor)
+            self._cumulative.clear()
+
+    def _add(self, group: str, bins: np.ndarray, cells: np.ndarray):
+        counts = self.groups.get(group)
+        if counts is None:
+            counts = self.groups[group] = np.zeros((2, self.bins), dtype=np.int64)
+            self.grids[group] = np.zeros((self.density_bins, self.density_bins), dtype=np.int64)
+        for dim in range(2):
+            counts[dim] += np.bincount(bins[dim], minlength=self.bins)
+        self.grids[group] += np.bincount(cells, minlength=self.density_bins ** 2).reshape(
+            self.density_bins, self.density_bins
+        )
+
+    def density(self, group: str = ALL) -> np.ndarray:
+        """Copy of the (analytical, communication) count grid for group, or None"""
+        with self._lock:
+            grid = self.grids.get(group)
+            return None if grid is None else grid.copy()
+
+    def count(self, group: str = ALL) -> int:
+        with self._lock:
+            counts = self.groups.get(group)
+            return 0 if counts is None else int(counts[0].sum())
+
+    def group_counts(self) -> dict:
+        """{group: results counted}, read together so a concurrent add_rows cannot change the groups mid-iteration"""
+        with self._lock:
+            return {group: int(counts[0].sum()) for group, counts in self.groups.items()}
+
+    def percentile(self, group: str, analytical_score: float, communication_score: float) -> tuple:
+        """
+        (analytical, communication) mid-rank percentiles, 0-100, of the
+        scores within group; None if the group has no results
+        """
+        with self._lock:
+            counts = self.groups.get(group)
+            if counts is None:
+                return None
+            cumulative = self._cumulative.get(group)
+            if cumulative is None:
+                cumulative = self._cumulative[group] = np.cumsum(counts, axis=1)
+            total = cumulative[0, -1]
+            if not total:
+                return None
+            result = []
+            for dim, score in enumerate((analytical_score, communication_score)):
+                b = min(max(int(score * self.bins), 0), self.bins - 1)
+                in_bin = counts[dim, b]
+                below = cumulative[dim, b] - in_bin
+                result.append(float(100.0 * (below + 0.5 * in_bin) / total))
+        return tuple(result)
+
+    def catch_up(self, backend, page_size: int = 5000) -> int:
+        """Fold in results not yet counted; returns the rows read"""
+        rows = 0
+        for page in backend.iter_results(page_size=page_size, after_id=max(0, self.last_id - TAIL_WINDOW)):
+            self.add_rows(page)
+            rows += len(page)
+        return rows
+
+    def save(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            groups = sorted(self.groups)
+            counts = np.stack([self.groups[g] for g in groups]) if groups else np.zeros((0, 2, self.bins), np.int64)
+            grids = (np.stack([self.grids[g] for g in groups]) if groups
+                     else np.zeros((0, self.density_bins, self.density_bins), np.int64))
+            last_id = self.last_id
+            recent = np.array(sorted(self.recent), dtype=np.int64)
+        tmp_path = path + '.tmp.npz'
+        np.savez_compressed(
+            tmp_path, groups=np.array(groups, dtype=str), counts=counts, grids=grids,
+            last_id=last_id, recent=recent, version=np.array(self.version or '', dtype=str),
+            source=np.array(self.source or '', dtype=str)
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'PercentileSketch':
+        with np.load(path) as data:
+            counts, grids = data['counts'], data['grids']
+            sketch = cls(bins=counts.shape[-1], version=str(data['version']) or None, density_bins=grids.shape[-1],
+                         source=str(data['source']) or None)
+            sketch.groups = {str(g): counts[i].copy() for i, g in enumerate(data['groups'])}
+            sketch.grids = {str(g): grids[i].copy() for i, g in enumerate(data['groups'])}
+            sketch.last_id = int(data['last_id'])
+            sketch.recent = set(data['recent'].tolist())
+        return sketch
+
+
+class PercentileService:
+    """
+    Keeps a PercentileSketch current without ever blocking a page view.
+    The sketch is restored from its snapshot file on first use, and
+    reads of newer results happen on a background thread after each
+    write and at least every refresh_interval seconds. Snapshots from a
+    different question bank version or backend are rebuilt from scratch,
+    and a backend without an identity gets no snapshot at all.
+    """
+
+    def __init__(self, path: str = None, refresh_interval: float = None, min_count: int = None,
+                 version: str = None):
+        self.path = path or config.PERCENTILE_SNAPSHOT_PATH
+        self.refresh_interval = refresh_interval if refresh_interval is not None else config.PERCENTILE_REFRESH_INTERVAL
+        self.min_count = min_count if min_count is not None else config.PERCENTILE_MIN_COUNT
+        self.version = version or get_question_bank().version
+        try:
+            self.source = database.get_backend().identity
+        except Exception as e:
+            print(f"Error opening backend for percentiles: {e}")
+            self.source = None
+        self.sketch = self._restore()
+        self._last_refresh = 0.0
+        self._dirty = True
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def _restore(self):
+        if self.path and self.source and os.path.exists(self.path):
+            try:
+                sketch = PercentileSketch.load(self.path)
+                if sketch.version == self.version and sketch.source == self.source:
+                    return sketch
+            except Exception as e:
+                print(f"Error loading percentile snapshot: {e}")
+        return PercentileSketch(version=self.version, source=self.source)
+
+    def notify_write(self):
+        self._dirty = True
+
+    def refresh(self):
+        """Catch up with the backend and persist the snapshot"""
+        try:
+            backend = database.get_backend()
+            if backend.identity != self.source:
+                # The backend was swapped (database.set_backend); start over from it
+                self.source = backend.identity
+                self.sketch = self._restore()
+            if self.sketch.catch_up(backend) and self.path and self.source:
+                self.sketch.save(self.path)
+        except Exception as e:
+            print(f"Error refreshing percentiles: {e}")
+        finally:
+            with self._lock:
+                self._refreshing = False
+                self._last_refresh = time.monotonic()
+
+    def _maybe_refresh(self):
+        with self._lock:
+            due = self._dirty or time.monotonic() - self._last_refresh >= self.refresh_interval
+            if self._refreshing or not due:
+                return
+            self._refreshing = True
+            self._dirty = False
+        threading.Thread(target=self.refresh, name="percentile-refresh", daemon=True).start()
+
+    def lookup(self, profession: str, analytical_score: float, communication_score: float) -> dict:
+        """
+        {'overall': (analytical, communication), 'profession': (...)}
+        percentiles from the current sketch; a group with fewer than
+        min_count results maps to None
+        """
+        self._maybe_refresh()
+        sketch = self.sketch
+        return {
+            'overall': sketch.percentile(ALL, analytical_score, communication_score)
+            if sketch.count(ALL) >= self.min_count else None,
+            'profession': sketch.percentile(profession or '', analytical_score, communication_score)
+            if profession is not None and sketch.count(profession) >= self.min_count else None,
+        }
+
+    def density(self, group: str = ALL) -> np.ndarray:
+        """Population count grid for group (ALL or a profession); None below min_count results"""
+        self._maybe_refresh()
+        if self.sketch.count(group) < self.min_count:
+            return None
+        return self.sketch.density(group)
+
+    def groups(self) -> list:
+        """Professions with enough results to show"""
+        return sorted(g for g, count in self.sketch.group_counts().items() if g != ALL and count >= self.min_count)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_percentile_service() -> PercentileService:
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = PercentileService()
+                database.add_write_listener(_service.notify_write)
+                # Start catching up now rather than on the first lookup
+                _service._maybe_refresh()
+    return _service
@@ -0,0 +1,226 @@
+# plots.py
+import json
+from functools import lru_cache
+
+import plotly.graph_objects as go
+
+from metrics import timed
+from profiles import PROFILES, classify
+
+# Marker color and symbol for each profile
+PROFILE_STYLES = {
+    "Strategic Communicator": ("#4CAF50", "star"),  # Green
+    "Technical Expert": ("#2196F3", "diamond"),  # Blue
+    "Storyteller": ("#FF9800", "circle"),  # Orange
+    "Intuitive Analyst": ("#9C27B0", "square"),  # Purple
+}
+
+
+@lru_cache(maxsize=1)
+def _base_figure() -> go.Figure:
+    """Quadrant backgrounds, reference lines, axes and labels, built and validated once per process"""
+    # Create figure
+    fig = go.Figure()
+
+    # Add gradient background for quadrants (subtle)
+    fig.add_trace(go.Scatter(
+        x=[0, 5, 5, 0],
+        y=[0, 0, 5, 5],
+        fill='toself',
+        fillcolor='rgba(156, 39, 176, 0.1)',  # Purple tint
+        line=dict(width=0),
+        showlegend=False,
+        hoverinfo='skip'
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=[5, 10, 10, 5],
+        y=[0, 0, 5, 5],
+        fill='toself',
+        fillcolor='rgba(33, 150, 243, 0.1)',  # Blue tint
+        line=dict(width=0),
+        showlegend=False,
+        hoverinfo='skip'
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=[0, 5, 5, 0],
+        y=[5, 5, 10, 10],
+        fill='toself',
+        fillcolor='rgba(255, 152, 0, 0.1)',  # Orange tint
+        line=dict(width=0),
+        showlegend=False,
+        hoverinfo='skip'
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=[5, 10, 10, 5],
+        y=[5, 5, 10, 10],
+        fill='toself',
+        fillcolor='rgba(76, 175, 80, 0.1)',  # Green tint
+        line=dict(width=0),
+        showlegend=False,
+        hoverinfo='skip'
+    ))
+
+    # Add quadrant lines
+    fig.add_hline(y=5, line_dash="dash", line_color="rgba(128, 128, 128, 0.3)", line_width=1)
+    fig.add_vline(x=5, line_dash="dash", line_color="rgba(128, 128, 128, 0.3)", line_width=1)
+
+    # Update layout
+    fig.update_layout(
+        xaxis_title="Analytical Approach",
+        yaxis_title="Communication Style",
+        xaxis=dict(
+            range=[-0.5, 10.5],
+            showgrid=False,
+            zeroline=False,
+            ticks="outside",
+            tickvals=[0, 5, 10],
+            ticktext=["Beginner", "Intermediate", "Expert"]
+        ),
+        yaxis=dict(
+            range=[-0.5, 10.5],
+            showgrid=False,
+            zeroline=False,
+            ticks="outside",
+            tickvals=[0, 5, 10],
+            ticktext=["Beginner", "Intermediate", "Expert"]
+        ),
+        plot_bgcolor='white',
+        width=800,
+        height=500,
+        margin=dict(t=100),
+        showlegend=False
+    )
+
+    # Add quadrant labels with modern styling
+    annotations = [
+        dict(x=7.5, y=7.5, text="Strategic<br>Communicator", 
+             font=dict(size=12, color="#4CAF50")),
+        dict(x=7.5, y=2.5, text="Technical<br>Expert", 
+             font=dict(size=12, color="#2196F3")),
+        dict(x=2.5, y=7.5, text="Storyteller", 
+             font=dict(size=12, color="#FF9800")),
+        dict(x=2.5, y=2.5, text="Intuitive<br>Analyst", 
+             font=dict(size=12, color="#9C27B0"))
+    ]
+
+    for annot in annotations:
+        fig.add_annotation(
+            x=annot["x"],
+            y=annot["y"],
+            text=annot["text"],
+            showarrow=False,
+            font=annot["font"],
+            align="center",
+            bordercolor=annot["font"]["color"],
+            borderwidth=1,
+            borderpad=4,
+            bgcolor="rgba(255, 255, 255, 0.8)",
+            opacity=0.8
+        )
+
+    return fig
+
+
+@lru_cache(maxsize=len(PROFILES))
+def quadrant_figure_json(profile: str) -> str:
+    """
+    Serialized figure for one profile quadrant: the shared base plus the
+    profile's title and marker style, with the marker at the origin.
+    """
+    color, symbol = PROFILE_STYLES[profile]
+    fig = go.Figure(_base_figure())
+
+    # Add user's position with pulsing animation
+    fig.add_trace(go.Scatter(
+        x=[0],
+        y=[0],
+        mode='markers',
+        marker=dict(
+            size=20,
+            color=color,
+            symbol=symbol,
+            line=dict(
+                color='white',
+                width=2
+            )
+        ),
+        name="Your Position",
+        hovertemplate="<b>Your Profile</b><br>" +
+                     "Analytical: %{x:.1f}/10<br>" +
+                     "Communication: %{y:.1f}/10<br>" +
+                     f"Type: {profile}<extra></extra>"
+    ))
+
+    # Title names the profile in its color
+    fig.update_layout(
+        title={
+            'text': f"<b>Your Data Analysis Style</b><br><span style='font-size: 16px; color: {color}'>You are a {profile}</span>",
+            'y':0.95,
+            'x':0,
+            'xanchor': 'left',
+            'yanchor': 'top'
+        }
+    )
+
+    return fig.to_json()
+
+
+def density_trace(counts) -> dict:
+    """
+    Heatmap trace of a population count grid indexed [analytical, communication],
+    as plain JSON. Shading is log-scaled so sparse corners stay visible and empty
+    cells are left transparent; the payload is one value per cell however many
+    respondents there are.
+    """
+    import numpy as np
+
+    counts = np.asarray(counts)
+    bins = counts.shape[0]
+    # Heatmap rows are y values, so communication runs down the rows
+    shade = np.log1p(counts.T).astype(object)
+    shade[counts.T == 0] = None
+    return {
+        "type": "heatmap",
+        "x0": 5 / bins,
+        "dx": 10 / bins,
+        "y0": 5 / bins,
+        "dy": 10 / bins,
+        "z": shade.tolist(),
+        "customdata": counts.T.tolist(),
+        "zmin": 0,
+        "colorscale": [[0, "rgba(96, 125, 139, 0.15)"], [1, "rgba(38, 50, 56, 0.75)"]],
+        "showscale": False,
+        "hoverongaps": False,
+        "hovertemplate": "%{customdata} respondents<extra></extra>",
+    }
+
+
+@timed('plots.create_quadrant_plot')
+def create_quadrant_plot(analytical_score, communication_score, density=None):
+    """
+    Create enhanced quadrant plot with dynamic subtitle and modern design.
+    With a density count grid, everyone else is shaded in beneath the user marker.
+    """
+    figure = json.loads(quadrant_figure_json(classify(analytical_score, communication_score)))
+
+    # The user marker is the last trace; only its position differs per request
+    marker = figure["data"][-1]
+    marker["x"] = [analytical_score * 10]
+    marker["y"] = [communication_score * 10]
+    if density is not None:
+        figure["data"].insert(-1, density_trace(density))
+
+    # The template was validated when it was built
+    return go.Figure(figure, _validate=False)
+
+
+@timed('plots.create_population_plot')
+def create_population_plot(density, title="All respondents"):
+    """The quadrant chart shaded by a population count grid, without a user marker"""
+    figure = json.loads(_base_figure().to_json())
+    figure["data"].append(density_trace(density))
+    figure["layout"]["title"] = {'text': f"<b>{title}</b>", 'y': 0.95, 'x': 0, 'xanchor': 'left', 'yanchor': 'top'}
+    return go.Figure(figure, _validate=False)
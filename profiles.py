@@ -0,0 +1,79 @@
+# profiles.py
+# Profile classification without NumPy, for modules on the app's startup path
+
+# Scores at or above the threshold count as "high" on that dimension
+PROFILE_THRESHOLD = 0.5
+# Indexed by 2 * (analytical high) + (communication high)
+PROFILES = (
+    "Intuitive Analyst",
+    "Storyteller",
+    "Technical Expert",
+    "Strategic Communicator",
+)
+
+
+def classify(analytical_score: float, communication_score: float) -> str:
+    """Return the profile name for a pair of scores"""
+    high_analytical = analytical_score >= PROFILE_THRESHOLD
+    high_communication = communication_score >= PROFILE_THRESHOLD
+    return PROFILES[2 * high_analytical + high_communication]
+
+# (key strengths, opportunity areas) shown on the results page for each profile
+PROFILE_DETAILS = {
+    "Intuitive Analyst": (
+        (
+            "Quick pattern recognition",
+            "Practical problem-solving approach",
+            "Flexibility in analytical methods",
+            "Focus on business impact",
+        ),
+        (
+            "Develop a more structured approach to analysis",
+            "Build expertise in specific analytical tools or methods",
+            "Enhance your data visualization capabilities",
+            "Practice formal presentation of analytical findings",
+        ),
+    ),
+    "Storyteller": (
+        (
+            "Translating complex insights into compelling narratives",
+            "Creating impactful data visualizations",
+            "Understanding audience needs",
+            "Driving actionable insights from data",
+        ),
+        (
+            "Deepen your understanding of statistical methodologies",
+            "Develop more robust validation techniques for your analyses",
+            "Build expertise in advanced analytical tools",
+            "Strengthen your technical documentation skills",
+        ),
+    ),
+    "Technical Expert": (
+        (
+            "Deep technical expertise and thorough analysis",
+            "Strong attention to statistical validity",
+            "Excellence in research and methodology",
+            "Mastery of advanced analytical techniques",
+        ),
+        (
+            "Develop skills in translating technical concepts for non-technical audiences",
+            "Practice creating executive summaries of your analyses",
+            "Incorporate more visualizations in your work",
+            "Focus on stakeholder engagement and relationship building",
+        ),
+    ),
+    "Strategic Communicator": (
+        (
+            "Balancing deep analytical insights with clear communication",
+            "Adapting technical content for different audiences",
+            "Driving data-informed decision making",
+            "Building bridges between technical and non-technical teams",
+        ),
+        (
+            "Consider diving even deeper into advanced statistical methods",
+            "Develop frameworks to scale your communication approaches",
+            "Mentor others in balancing technical and communication skills",
+            "Lead cross-functional data initiatives",
+        ),
+    ),
+}
@@ -0,0 +1,122 @@
+# question_bank.py
+import hashlib
+import json
+import os
+from functools import lru_cache
+from typing import NamedTuple
+
+import config
+from questions import QUESTIONS
+
+
+class Option(NamedTuple):
+    id: int
+    text: str
+    analytical: float
+    communication: float
+
+
+class Question(NamedTuple):
+    id: int
+    text: str
+    options: tuple
+
+
+class QuestionBank:
+    """
+    Immutable, compiled question bank. Questions and options are tuples
+    with stable integer ids (taken from the source, defaulting to their
+    position), looked up by id in O(1). version is a content hash, stored
+    with every result so its answers can be reproduced and re-scored.
+    """
+
+    __slots__ = ('questions', 'version', '_by_id')
+
+    def __init__(self, questions):
+        questions = tuple(questions)
+        if not questions:
+            raise ValueError("A question bank needs at least one question")
+        by_id = {}
+        for question in questions:
+            if question.id in by_id:
+                raise ValueError(f"Duplicate question id {question.id}")
+            if len({option.id for option in question.options}) != len(question.options):
+                raise ValueError(f"Duplicate option id in question {question.id}")
+            by_id[question.id] = question
+        object.__setattr__(self, 'questions', questions)
+        object.__setattr__(self, '_by_id', by_id)
+        object.__setattr__(self, 'version', hashlib.sha256(
+            json.dumps(self.to_dicts(), sort_keys=True).encode('utf-8')
+        ).hexdigest()[:12])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("QuestionBank is immutable")
+
+    @classmethod
+    def from_dicts(cls, data: list) -> 'QuestionBank':
+        """Compile the QUESTIONS-style list of dicts; "id" keys are optional"""
+        return cls(
+            Question(
+                id=int(q.get('id', qi)),
+                text=q['text'],
+                options=tuple(
+                    Option(
+                        id=int(o.get('id', oi)),
+                        text=o['text'],
+                        analytical=float(o['analytical']),
+                        communication=float(o['communication'])
+                    )
+                    for oi, o in enumerate(q['options'])
+                )
+            )
+            for qi, q in enumerate(data)
+        )
+
+    @classmethod
+    def load(cls, path: str) -> 'QuestionBank':
+        """Load a bank from a .json, .yaml or .yml file holding a list of questions"""
+        with open(path, encoding='utf-8') as f:
+            if path.endswith(('.yaml', '.yml')):
+                import yaml  # optional dependency, only needed for YAML banks
+                data = yaml.safe_load(f)
+            else:
+                data = json.load(f)
+        if isinstance(data, dict):
+            data = data['questions']
+        return cls.from_dicts(data)
+
+    def to_dicts(self) -> list:
+        """QUESTIONS-style dicts; ids are only written where they differ from the position"""
+        data = []
+        for qi, question in enumerate(self.questions):
+            q = {'text': question.text, 'options': []}
+            if question.id != qi:
+                q['id'] = question.id
+            for oi, option in enumerate(question.options):
+                o = {'text': option.text, 'analytical': option.analytical, 'communication': option.communication}
+                if option.id != oi:
+                    o['id'] = option.id
+                q['options'].append(o)
+            data.append(q)
+        return data
+
+    def question(self, question_id: int) -> Question:
+        return self._by_id[question_id]
+
+    def __getitem__(self, index: int) -> Question:
+        return self.questions[index]
+
+    def __iter__(self):
+        return iter(self.questions)
+
+    def __len__(self):
+        return len(self.questions)
+
+
+@lru_cache(maxsize=None)
+def get_question_bank(path: str = None) -> QuestionBank:
+    """The bank from path or config.QUESTION_BANK_PATH, else the built-in QUESTIONS; compiled once"""
+    path = path or config.QUESTION_BANK_PATH
+    if path:
+        return QuestionBank.load(os.path.expanduser(path))
+    return QuestionBank.from_dicts(QUESTIONS)
@@ -0,0 +1,124 @@
+# reporting.py
+import numpy as np
+import pandas as pd
+
+from aggregates import HISTOGRAM_BINS
+from database import get_aggregates, iter_results
+from profiles import PROFILES
+from scoring import classify_batch
+
+RESULT_COLUMNS = ['id', 'email', 'profession', 'analytical_score', 'communication_score', 'created_at']
+PROFESSION_SCORE_COLUMNS = ['Results', 'Analytical mean', 'Analytical std', 'Communication mean', 'Communication std']
+
+
+
+def results_frames(page_size: int = 5000):
+    """Stream results as one columnar DataFrame per page"""
+    for page in iter_results(page_size=page_size):
+        frame = pd.DataFrame.from_records(page, columns=RESULT_COLUMNS)
+        frame['profession'] = frame['profession'].astype('category')
+        frame[['analytical_score', 'communication_score']] = frame[
+            ['analytical_score', 'communication_score']
+        ].astype('float64')
+        yield frame
+
+
+class ResultsSummary:
+    """
+    Dashboard aggregates folded page by page, so memory depends on the
+    number of professions and histogram bins, never on the number of results.
+    """
+
+    def __init__(self, bins: int = HISTOGRAM_BINS):
+        self.bins = bins
+        self.bin_edges = np.linspace(0.0, 1.0, bins + 1)
+        self.total = 0
+        self.profile_counts = np.zeros(len(PROFILES), dtype=np.int64)
+        self.profession_counts = {}
+        self.analytical_hist = np.zeros(bins, dtype=np.int64)
+        self.communication_hist = np.zeros(bins, dtype=np.int64)
+
+    def add(self, frame: pd.DataFrame):
+        scores = frame[['analytical_score', 'communication_score']].to_numpy()
+        self.total += len(frame)
+        self.profile_counts += np.bincount(classify_batch(scores), minlength=len(PROFILES))
+        for profession, count in frame['profession'].value_counts(sort=False).items():
+            self.profession_counts[profession] = self.profession_counts.get(profession, 0) + int(count)
+        # Same binning as aggregates.score_bin
+        bin_index = np.minimum((scores * self.bins).astype(np.intp), self.bins - 1)
+        self.analytical_hist += np.bincount(bin_index[:, 0], minlength=self.bins)
+        self.communication_hist += np.bincount(bin_index[:, 1], minlength=self.bins)
+
+    def profiles(self) -> pd.Series:
+        return pd.Series(self.profile_counts, index=list(PROFILES), name='results')
+
+    def professions(self) -> pd.Series:
+        return pd.Series(self.profession_counts, name='results', dtype='int64').sort_values(ascending=False)
+
+    def histograms(self) -> pd.DataFrame:
+        labels = [f"{lo:.2f}-{hi:.2f}" for lo, hi in zip(self.bin_edges[:-1], self.bin_edges[1:])]
+        return pd.DataFrame({
+            'Analytical': self.analytical_hist,
+            'Communication': self.communication_hist,
+        }, index=labels)
+
+
+def summarize_results(page_size: int = 5000, bins: int = HISTOGRAM_BINS) -> ResultsSummary:
+    """Stream every result through a ResultsSummary"""
+    summary = ResultsSummary(bins)
+    for frame in results_frames(page_size):
+        summary.add(frame)
+    return summary
+
+
+class AggregateSummary:
+    """
+    Dashboard data read from the incrementally maintained result_aggregates
+    table: a fixed number of rows, whatever the number of results.
+    """
+
+    def __init__(self, aggregates: dict = None):
+        if aggregates is None:
+            aggregates = get_aggregates()
+        self._by_dimension = {}
+        for (dimension, key), stats in aggregates.items():
+            self._by_dimension.setdefault(dimension, {})[key] = stats
+        overall = self._by_dimension.get('all', {}).get('')
+        self.total = overall.count if overall else 0
+
+    def _counts(self, dimension: str) -> pd.Series:
+        stats = self._by_dimension.get(dimension, {})
+        return pd.Series({key: s.count for key, s in stats.items()}, name='results', dtype='int64')
+
+    def profiles(self) -> pd.Series:
+        return self._counts('profile').reindex(list(PROFILES), fill_value=0)
+
+    def professions(self) -> pd.Series:
+        return self._counts('profession').sort_values(ascending=False)
+
+    def days(self) -> pd.Series:
+        return self._counts('day').sort_index()
+
+    def profession_scores(self) -> pd.DataFrame:
+        """Count, mean and standard deviation of both scores per profession"""
+        rows = {}
+        for profession, stats in self._by_dimension.get('profession', {}).items():
+            values = stats.as_dict()
+            rows[profession] = {
+                'Results': values['count'],
+                'Analytical mean': values['analytical_mean'],
+                'Analytical std': values['analytical_variance'] ** 0.5,
+                'Communication mean': values['communication_mean'],
+                'Communication std': values['communication_variance'] ** 0.5,
+            }
+        if not rows:
+            return pd.DataFrame(columns=PROFESSION_SCORE_COLUMNS)
+        return pd.DataFrame.from_dict(rows, orient='index').sort_values('Results', ascending=False)
+
+    def histograms(self) -> pd.DataFrame:
+        keys = [f"{i / HISTOGRAM_BINS:.2f}" for i in range(HISTOGRAM_BINS)]
+        labels = [f"{i / HISTOGRAM_BINS:.2f}-{(i + 1) / HISTOGRAM_BINS:.2f}" for i in range(HISTOGRAM_BINS)]
+        return pd.DataFrame({
+            'Analytical': self._counts('analytical_bin').reindex(keys, fill_value=0).to_numpy(),
+            'Communication': self._counts('communication_bin').reindex(keys, fill_value=0).to_numpy(),
+        }, index=labels)
@@ -0,0 +1,68 @@
+# rescore.py
+import argparse
+import time
+
+import numpy as np
+
+from database import get_backend
+from scoring import SCORING, unpack_answers
+
+
+def rescore_results(page_size: int = 5000, include_current: bool = False, dry_run: bool = False):
+    """
+    Re-score every stored attempt with raw answers against the current
+    question bank, streaming attempts page by page and writing the new
+    scores back in bulk. Returns (rescored, skipped) counts.
+    """
+    backend = get_backend()
+    backend.init_db()
+    rescored = skipped = 0
+    started = time.monotonic()
+
+    for page in backend.iter_attempts(page_size=page_size):
+        if not include_current:
+            page = [r for r in page if r['bank_version'] != SCORING.version]
+        # Answers recorded against a bank with a different question count
+        # cannot be mapped onto the current weights
+        usable = [r for r in page if len(r['answers']) == SCORING.n_questions]
+        skipped += len(page) - len(usable)
+        if not usable:
+            continue
+
+        answers = np.stack([unpack_answers(r['answers']) for r in usable])
+        valid = ((answers < SCORING.option_counts).all(axis=1))
+        skipped += int((~valid).sum())
+        usable = [r for r, ok in zip(usable, valid) if ok]
+        scores = SCORING.score_batch(answers[valid])
+
+        if not dry_run:
+            backend.update_scores_bulk([{
+                'id': r['id'],
+                'analytical_score': float(analytical),
+                'communication_score': float(communication),
+                'bank_version': SCORING.version
+            } for r, (analytical, communication) in zip(usable, scores)])
+        rescored += len(usable)
+
+        elapsed = time.monotonic() - started
+        print(f"Re-scored {rescored} attempts ({rescored / max(elapsed, 1e-9):.0f}/s)")
+
+    if rescored and not dry_run:
+        backend.rebuild_aggregates()
+
+    return rescored, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score stored attempts with the current question weights")
+    parser.add_argument('--page-size', type=int, default=5000, help="attempts fetched and updated per round-trip")
+    parser.add_argument('--all', action='store_true', help="also re-score attempts already on the current bank version")
+    parser.add_argument('--dry-run', action='store_true', help="compute scores without writing them")
+    args = parser.parse_args()
+
+    rescored, skipped = rescore_results(args.page_size, include_current=args.all, dry_run=args.dry_run)
+    print(f"Done: {rescored} re-scored, {skipped} skipped (bank version {SCORING.version})")
+
+
+if __name__ == "__main__":
+    main()
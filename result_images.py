@@ -0,0 +1,159 @@
+# result_images.py
+import hashlib
+import os
+import threading
+from functools import lru_cache
+
+import config
+from cache import ByteLRUCache
+from plots import create_quadrant_plot, quadrant_figure_json
+from profiles import PROFILE_THRESHOLD, classify
+
+MIME_TYPES = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+
+
+def quantize(score: float, step: float = None) -> float:
+    """
+    Snap a 0-1 score onto the image grid so nearby scores share one image.
+    Scores never move across the profile threshold.
+    """
+    step = step or config.RESULT_IMAGE_STEP
+    quantized = round(round(score / step) * step, 6)
+    if score < PROFILE_THRESHOLD <= quantized:
+        quantized = round(quantized - step, 6)
+    return quantized
+
+
+def render_figure(analytical_score: float, communication_score: float, fmt: str) -> bytes:
+    """Render the quadrant plot; needs the optional kaleido package and Chrome"""
+    return create_quadrant_plot(analytical_score, communication_score).to_image(
+        format=fmt, width=800, height=500
+    )
+
+
+@lru_cache(maxsize=None)
+def _template_hash(profile: str) -> str:
+    # Part of every key, so a restyled chart never serves stale images
+    return hashlib.sha256(quadrant_figure_json(profile).encode('utf-8')).hexdigest()
+
+
+class DiskImageCache:
+    """
+    Content-addressed image files under a directory, evicting the least
+    recently used files once their total size exceeds max_bytes.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.size = sum(entry.stat().st_size for entry in self._entries())
+
+    def _entries(self):
+        for shard in os.scandir(self.directory):
+            if shard.is_dir():
+                yield from (entry for entry in os.scandir(shard.path) if entry.is_file())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        # Access time drives eviction order
+        os.utime(path)
+        return data
+
+    def set(self, key: str, data: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        with self._lock:
+            try:
+                self.size -= os.path.getsize(path)
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, path)
+            self.size += len(data)
+            if self.size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Drop oldest files until the cache is back under 90% of its budget
+        target = self.max_bytes * 0.9
+        for entry in sorted(self._entries(), key=lambda e: e.stat().st_mtime):
+            if self.size <= target:
+                break
+            size = entry.stat().st_size
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            self.size -= size
+
+
+class ResultImageCache:
+    """
+    Pre-rendered result images keyed by quantized scores, profile and format.
+    Lookups go memory LRU -> disk -> render, filling the faster tiers on the way back.
+    """
+
+    def __init__(self, directory: str = None, memory_bytes: int = None, disk_bytes: int = None,
+                 renderer=render_figure):
+        self.memory = ByteLRUCache(memory_bytes or config.RESULT_IMAGE_MEMORY_BYTES)
+        self.disk = DiskImageCache(
+            directory or config.RESULT_IMAGE_DIR,
+            disk_bytes or config.RESULT_IMAGE_DISK_BYTES
+        )
+        self.renderer = renderer
+
+    @staticmethod
+    def key(analytical_score: float, communication_score: float, fmt: str) -> str:
+        profile = classify(analytical_score, communication_score)
+        content = f"{_template_hash(profile)}:{profile}:{analytical_score:.6f}:{communication_score:.6f}"
+        return f"{hashlib.sha256(content.encode('utf-8')).hexdigest()}.{fmt}"
+
+    def get(self, analytical_score: float, communication_score: float, fmt: str = 'png') -> bytes:
+        if fmt not in MIME_TYPES:
+            raise ValueError(f"Unsupported image format '{fmt}'")
+        analytical_score = quantize(analytical_score)
+        communication_score = quantize(communication_score)
+        key = self.key(analytical_score, communication_score, fmt)
+
+        data = self.memory.get(key)
+        if data is not None:
+            return data
+        data = self.disk.get(key)
+        if data is None:
+            data = self.renderer(analytical_score, communication_score, fmt)
+            self.disk.set(key, data)
+        self.memory.set(key, data)
+        return data
+
+
+_image_cache = None
+_image_cache_lock = threading.Lock()
+
+
+def get_image_cache() -> ResultImageCache:
+    global _image_cache
+    if _image_cache is None:
+        with _image_cache_lock:
+            if _image_cache is None:
+                _image_cache = ResultImageCache()
+    return _image_cache
+
+
+def render_result_image(analytical_score: float, communication_score: float, fmt: str = 'png') -> bytes:
+    """Static PNG/SVG of the quadrant plot for emails and low-bandwidth clients"""
+    return get_image_cache().get(analytical_score, communication_score, fmt)
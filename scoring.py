@@ -0,0 +1,83 @@
+# scoring.py
+import numpy as np
+
+from metrics import timed
+from profiles import PROFILE_THRESHOLD
+from question_bank import QuestionBank, get_question_bank
+
+DIMENSIONS = ('analytical', 'communication')
+
+
+class ScoringMatrix:
+    """
+    Question bank compiled into a weight array of shape
+    (questions, options, dimensions). Answers are option indices,
+    one per question, in question order.
+    """
+
+    def __init__(self, bank):
+        if not isinstance(bank, QuestionBank):
+            bank = QuestionBank.from_dicts(bank)
+        self.bank = bank
+        self.n_questions = len(bank)
+        self.n_options = max(len(q.options) for q in bank)
+        self.option_counts = np.array([len(q.options) for q in bank], dtype=np.intp)
+        self.weights = np.zeros((self.n_questions, self.n_options, len(DIMENSIONS)))
+        for qi, question in enumerate(bank):
+            for oi, option in enumerate(question.options):
+                self.weights[qi, oi] = [getattr(option, dim) for dim in DIMENSIONS]
+        self.weights.setflags(write=False)
+        self._rows = np.arange(self.n_questions)
+        # Stored with raw answers so they can be re-scored
+        self.version = bank.version
+
+    def _check(self, answers: np.ndarray):
+        if answers.shape[-1] != self.n_questions:
+            raise ValueError(f"Expected {self.n_questions} answers per attempt, got {answers.shape[-1]}")
+        if ((answers < 0) | (answers >= self.option_counts)).any():
+            raise ValueError("Answer index out of range for its question")
+
+    def score(self, answers) -> tuple:
+        """Return (analytical, communication) for one attempt"""
+        analytical, communication = self.score_batch(np.asarray(answers)[np.newaxis])[0]
+        return float(analytical), float(communication)
+
+    @timed('scoring.score_batch')
+    def score_batch(self, answers, chunk_size: int = 1_000_000) -> np.ndarray:
+        """
+        Score an (attempts, questions) matrix of option indices.
+        Returns an (attempts, dimensions) float array of mean weights.
+        """
+        answers = np.asarray(answers, dtype=np.intp)
+        if answers.ndim != 2:
+            raise ValueError("Expected a 2-D (attempts, questions) answer matrix")
+        self._check(answers)
+        scores = np.empty((answers.shape[0], len(DIMENSIONS)))
+        for start in range(0, answers.shape[0], chunk_size):
+            chunk = answers[start:start + chunk_size]
+            picked = self.weights[self._rows, chunk]  # (chunk, questions, dimensions)
+            # Accumulate question by question so results match the
+            # left-to-right float sum the app has always used
+            total = picked[:, 0].copy()
+            for qi in range(1, self.n_questions):
+                total += picked[:, qi]
+            scores[start:start + chunk_size] = total / self.n_questions
+        return scores
+
+
+def classify_batch(scores) -> np.ndarray:
+    """Return profile indices into PROFILES for an (attempts, dimensions) score array"""
+    high = np.asarray(scores) >= PROFILE_THRESHOLD
+    return 2 * high[:, 0].astype(np.intp) + high[:, 1]
+
+
+def pack_answers(answers) -> bytes:
+    """Pack option indices into one byte per question for storage"""
+    return np.asarray(answers, dtype=np.uint8).tobytes()
+
+
+def unpack_answers(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype=np.uint8)
+
+
+SCORING = ScoringMatrix(get_question_bank())
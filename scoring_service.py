@@ -0,0 +1,303 @@
+# scoring_service.py
+import argparse
+import hmac
+import ipaddress
+import json
+import multiprocessing
+import socket
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+import config
+import database
+from metrics import start_exporters, timed
+from profiles import PROFILES
+from scoring import SCORING, classify_batch, pack_answers
+from validation import MESSAGES, check_email
+
+# HTTP status of each kind of per-submission error; only UNAVAILABLE is worth retrying
+INVALID, UNKNOWN_USER, UNAVAILABLE = 400, 404, 503
+# Ids are stored as 64-bit integers; client submission ids are bounded strings
+MAX_USER_ID = 2 ** 63 - 1
+MAX_SUBMISSION_ID_LENGTH = 128
+
+
+def _fail(result: dict, status: int, message: str) -> dict:
+    result.clear()
+    result.update(error=message, status=status)
+    return result
+
+
+class ScoringService:
+    """
+    Scores and classifies answer submissions without a Streamlit session.
+
+    A submission is a dict with answers (one option index per question,
+    in bank order) and optionally email and profession, or an existing
+    user_id, to store the result. A submission_id makes storing
+    idempotent; one is generated when missing. Every valid submission in
+    a batch is scored in one vectorized call and stored in one bulk write.
+    """
+
+    def __init__(self, scoring=SCORING, max_batch: int = None):
+        self.scoring = scoring
+        self.max_batch = max_batch or config.SCORING_SERVICE_MAX_BATCH
+
+    def _check(self, submission) -> str:
+        """Error message for a malformed submission, or None"""
+        if not isinstance(submission, dict):
+            return "Submission must be an object"
+        answers = submission.get('answers')
+        if not isinstance(answers, list) or len(answers) != self.scoring.n_questions:
+            return f"answers must list {self.scoring.n_questions} option indices"
+        for answer, count in zip(answers, self.scoring.option_counts.tolist()):
+            if not isinstance(answer, int) or isinstance(answer, bool) or not 0 <= answer < count:
+                return "Answer index out of range for its question"
+        user_id = submission.get('user_id')
+        if user_id is not None and (not isinstance(user_id, int) or isinstance(user_id, bool)
+                                    or not 0 < user_id <= MAX_USER_ID):
+            return "user_id must be a positive 64-bit integer"
+        submission_id = submission.get('submission_id')
+        if submission_id is not None and (not isinstance(submission_id, str)
+                                          or not 0 < len(submission_id) <= MAX_SUBMISSION_ID_LENGTH):
+            return f"submission_id must be a string of 1 to {MAX_SUBMISSION_ID_LENGTH} characters"
+        email = submission.get('email')
+        if email is not None:
+            if not isinstance(email, str) or not isinstance(submission.get('profession'), str):
+                return "email and profession must both be strings"
+            reason = check_email(email)
+            if reason != 'ok':
+                return MESSAGES[reason]
+        return None
+
+    def score_batch(self, submissions: list) -> list:
+        """
+        Scores and profile for each submission, without storing anything.
+        Malformed submissions get {'error': message, 'status': 400} in their place.
+        """
+        if len(submissions) > self.max_batch:
+            raise ValueError(f"At most {self.max_batch} submissions per batch")
+        errors = [self._check(s) for s in submissions]
+        valid = [i for i, error in enumerate(errors) if error is None]
+        results = [{'error': error, 'status': INVALID} for error in errors]
+        if valid:
+            with timed('service.score_batch'):
+                answers = np.array([submissions[i]['answers'] for i in valid], dtype=np.intp)
+                scores = self.scoring.score_batch(answers)
+                profiles = classify_batch(scores)
+            for i, (analytical, communication), profile in zip(valid, scores.tolist(), profiles.tolist()):
+                results[i] = {
+                    'analytical_score': analytical,
+                    'communication_score': communication,
+                    'profile': PROFILES[profile],
+                    'bank_version': self.scoring.version,
+                }
+        return results
+
+    def submit_batch(self, submissions: list) -> list:
+        """
+        Score submissions and store those naming a user. New users are
+        created with one bulk upsert, given user_ids are checked in one
+        lookup and results are written with one bulk insert. Stored results
+        also carry user_id and submission_id. A submission that cannot be
+        stored gets an error and status instead: 404 for an unknown
+        user_id, 503 when the backend failed (safe to resubmit).
+        """
+        results = self.score_batch(submissions)
+        pending = [(s, r) for s, r in zip(submissions, results)
+                   if 'error' not in r and (s.get('user_id') is not None or s.get('email') is not None)]
+
+        new_users = [s for s, _ in pending if s.get('user_id') is None]
+        user_ids = database.upsert_users(new_users) if new_users else {}
+        given = {s['user_id'] for s, _ in pending if s.get('user_id') is not None}
+        known = database.existing_user_ids(given) if given else set()
+
+        rows, stored = [], []
+        for submission, result in pending:
+            if submission.get('user_id') is not None:
+                user_id = submission['user_id']
+                if known is None:
+                    _fail(result, UNAVAILABLE, "Could not check the user")
+                    continue
+                if user_id not in known:
+                    _fail(result, UNKNOWN_USER, "Unknown user_id")
+                    continue
+            else:
+                user_id = user_ids.get(submission['email']) if user_ids is not None else None
+                if user_id is None:
+                    _fail(result, UNAVAILABLE, "Could not save the user")
+                    continue
+            submission_id = submission.get('submission_id') or uuid.uuid4().hex
+            result.update(user_id=user_id, submission_id=submission_id)
+            rows.append({
+                'user_id': user_id,
+                'analytical_score': result['analytical_score'],
+                'communication_score': result['communication_score'],
+                'created_at': datetime.now().isoformat(),
+                'submission_id': submission_id,
+                'answers': pack_answers(submission['answers']),
+                'bank_version': self.scoring.version,
+            })
+            stored.append(result)
+        if rows and not database.save_results_bulk(rows):
+            for result in stored:
+                _fail(result, UNAVAILABLE, "Could not save the result")
+        return results
+
+    def submit(self, submission: dict) -> dict:
+        """submit_batch for a single submission"""
+        return self.submit_batch([submission])[0]
+
+
+_service = None
+
+
+def get_scoring_service() -> ScoringService:
+    """The process-wide service; creates the backend's tables on first use"""
+    global _service
+    if _service is None:
+        database.init_db()
+        _service = ScoringService()
+    return _service
+
+
+class _ScoringHandler(BaseHTTPRequestHandler):
+    """
+    POST /score takes one submission, or {"submissions": [...]} for a
+    batch, and answers with the result or {"results": [...]}.
+    GET /health reports the question bank version being scored.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def _send(self, status: int, payload: dict):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self) -> bool:
+        if not config.SCORING_SERVICE_TOKEN:
+            return True
+        expected = f"Bearer {config.SCORING_SERVICE_TOKEN}"
+        return hmac.compare_digest(self.headers.get('Authorization', '').encode(), expected.encode())
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send(200, {'status': 'ok', 'bank_version': SCORING.version})
+        else:
+            self._send(404, {'error': "Not found"})
+
+    def do_POST(self):
+        with timed('service.request'):
+            if self.path != '/score':
+                self._send(404, {'error': "Not found"})
+                return
+            if not self._authorized():
+                self._send(401, {'error': "Missing or invalid bearer token"})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', ''))
+            except ValueError:
+                length = -1
+            if not 0 < length <= config.SCORING_SERVICE_MAX_BODY:
+                # The body is left unread, so the connection cannot be reused
+                self.close_connection = True
+                self._send(413 if length > 0 else 411,
+                           {'error': f"Content-Length must be between 1 and {config.SCORING_SERVICE_MAX_BODY}"})
+                return
+            try:
+                body = json.loads(self.rfile.read(length))
+            except ValueError:
+                self._send(400, {'error': "Request body must be JSON"})
+                return
+            service = get_scoring_service()
+            try:
+                if isinstance(body, dict) and 'submissions' in body:
+                    if not isinstance(body['submissions'], list):
+                        self._send(400, {'error': "submissions must be a list"})
+                        return
+                    self._send(200, {'results': service.submit_batch(body['submissions'])})
+                else:
+                    result = service.submit(body)
+                    self._send(result.get('status', 200), result)
+            except ValueError as e:
+                self._send(413, {'error': str(e)})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _ScoringServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        # Every worker process binds the same port; the kernel spreads connections between them
+        if hasattr(socket, 'SO_REUSEPORT'):
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+
+def serve(host: str, port: int):
+    """Run one server process until interrupted"""
+    database.init_db()
+    start_exporters()
+    server = _ScoringServer((host, port), _ScoringHandler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        database.get_backend().close()
+
+
+def _is_loopback(host: str) -> bool:
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return host == 'localhost'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve assessment scoring over HTTP")
+    parser.add_argument('--host', default=config.SCORING_SERVICE_HOST,
+                        help="address to listen on; anything but loopback needs SCORING_SERVICE_TOKEN")
+    parser.add_argument('--port', type=int, default=config.SCORING_SERVICE_PORT)
+    parser.add_argument('--workers', type=int, default=config.SCORING_SERVICE_WORKERS,
+                        help="server processes sharing the port")
+    args = parser.parse_args()
+
+    if not config.SCORING_SERVICE_TOKEN and not _is_loopback(args.host):
+        # The service writes results for any caller-supplied user
+        parser.error(f"refusing to listen on {args.host} without SCORING_SERVICE_TOKEN")
+
+    workers = args.workers
+    if workers > 1 and not hasattr(socket, 'SO_REUSEPORT'):
+        print("SO_REUSEPORT is not available on this platform; running a single worker")
+        workers = 1
+    print(f"Scoring on http://{args.host}:{args.port} with {workers} worker(s), bank version {SCORING.version}")
+    if workers == 1:
+        serve(args.host, args.port)
+        return
+    processes = [
+        multiprocessing.Process(target=serve, args=(args.host, args.port), name=f"scoring-{i}")
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
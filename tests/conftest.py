@@ -0,0 +1,21 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+# The app's modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def backend(tmp_path):
+    """A fresh SQLite database, installed as the process-wide backend for the test"""
+    import database
+
+    previous = database._backend
+    backend = database.SQLiteBackend(path=str(tmp_path / "assessment.db"))
+    backend.init_db()
+    database.set_backend(backend)
+    yield backend
+    database.set_backend(previous)
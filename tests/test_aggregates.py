@@ -0,0 +1,59 @@
+# tests/test_aggregates.py
+import random
+
+import pytest
+
+from aggregates import RunningStats
+from reporting import PROFESSION_SCORE_COLUMNS, AggregateSummary
+
+PROFESSIONS = ["Data Analyst", "Data Scientist", "Student"]
+
+
+def _stats(aggregates: dict) -> dict:
+    return {key: (s.count, s.analytical_mean, s.analytical_m2, s.communication_mean, s.communication_m2)
+            for key, s in aggregates.items()}
+
+
+def test_rebuild_matches_incremental_merge(backend):
+    rng = random.Random(0)
+    users = [backend.save_user(f"user{i}@example.com", PROFESSIONS[i % len(PROFESSIONS)]) for i in range(12)]
+    for n in range(300):
+        backend.save_results(rng.choice(users), rng.random(), rng.random(), submission_id=f"s{n}")
+    backend.save_results_bulk([{
+        'user_id': rng.choice(users),
+        'analytical_score': rng.random(),
+        'communication_score': rng.random(),
+        'created_at': '2024-01-01T00:00:00',
+        'submission_id': f"b{n}",
+    } for n in range(200)])
+
+    incremental = _stats(backend.get_aggregates())
+    backend.rebuild_aggregates()
+    rebuilt = _stats(backend.get_aggregates())
+
+    assert incremental.keys() == rebuilt.keys()
+    for key, values in incremental.items():
+        assert rebuilt[key] == pytest.approx(values, rel=1e-9, abs=1e-9), key
+
+
+def test_rebuild_of_identical_scores_has_no_negative_variance(backend):
+    user_id = backend.save_user("same@example.com", "Student")
+    for n in range(3):
+        backend.save_results(user_id, 0.42, 0.42, submission_id=f"s{n}")
+    backend.rebuild_aggregates()
+
+    for stats in backend.get_aggregates().values():
+        assert stats.analytical_m2 >= 0.0 and stats.communication_m2 >= 0.0
+    scores = AggregateSummary(backend.get_aggregates()).profession_scores()
+    assert scores.loc["Student", "Analytical std"] == pytest.approx(0.0, abs=1e-6)
+    assert scores.dtypes.map(lambda dtype: dtype.kind).isin(['i', 'f']).all()
+
+
+def test_variance_is_clamped_at_zero():
+    stats = RunningStats(3, 0.42, -1e-16, 0.42, -1e-16).as_dict()
+    assert stats['analytical_variance'] == 0.0 and stats['communication_variance'] == 0.0
+
+
+def test_profession_scores_without_results():
+    scores = AggregateSummary({}).profession_scores()
+    assert scores.empty and list(scores.columns) == PROFESSION_SCORE_COLUMNS
@@ -0,0 +1,62 @@
+# tests/test_async_db.py
+import threading
+import time
+
+import pytest
+
+from async_db import AsyncDatabase, failed, resolve
+
+
+@pytest.fixture
+def async_db():
+    db = AsyncDatabase(max_concurrency=2, timeout=0.2, retries=2, backoff_base=0.01, backoff_max=0.05)
+    yield db
+    db.close()
+
+
+def test_failed_calls_are_retried(async_db):
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionError("backend unreachable")
+        return 42
+
+    assert async_db.submit(flaky).result(timeout=5) == 42
+    assert len(calls) == 3
+
+
+def test_call_fails_once_retries_are_exhausted(async_db):
+    def down():
+        raise ConnectionError("backend unreachable")
+
+    future = async_db.submit(down)
+    with pytest.raises(ConnectionError):
+        future.result(timeout=5)
+    assert resolve(future) is None and failed(future)
+
+
+def test_slow_attempts_time_out_and_are_retried(async_db):
+    calls = []
+
+    def slow_then_fast():
+        calls.append(1)
+        if len(calls) == 1:
+            time.sleep(0.5)
+        return "ok"
+
+    assert async_db.submit(slow_then_fast).result(timeout=5) == "ok"
+    assert len(calls) == 2
+
+
+def test_max_call_time_covers_every_attempt_and_backoff(async_db):
+    assert async_db.max_call_time == pytest.approx(3 * 0.2 + 0.01 + 0.02)
+
+
+def test_pending_call_is_not_reported_as_failed(async_db):
+    release = threading.Event()
+    future = async_db.submit(lambda: release.wait(5) and 7)
+    assert resolve(future, timeout=0.01) is None and not failed(future)
+    release.set()
+    assert resolve(future, timeout=5) == 7 and not failed(future)
@@ -0,0 +1,82 @@
+# tests/test_cache.py
+import threading
+import time
+
+import pytest
+
+from cache import ReadThroughCache
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_concurrent_misses_share_one_load():
+    cache = ReadThroughCache(ttl=60)
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    values = []
+    readers = [threading.Thread(target=lambda: values.append(cache.get('k', loader))) for _ in range(8)]
+    for reader in readers:
+        reader.start()
+    _wait_for(lambda: cache.get_stats()['misses'] == 8)
+    release.set()
+    for reader in readers:
+        reader.join()
+    assert values == ["value"] * 8 and len(calls) == 1
+    assert cache.get('k', loader) == "value" and len(calls) == 1
+
+
+def test_stale_value_is_served_while_it_reloads():
+    cache = ReadThroughCache(ttl=60)
+    versions = iter(["old", "new"])
+    cache.get('k', lambda: next(versions))
+    cache.invalidate()
+
+    assert cache.get('k', lambda: next(versions)) == "old"
+    _wait_for(lambda: cache.get_stats()['refreshes'] == 1 and not cache._loading)
+    assert cache.get('k', lambda: "unused") == "new"
+    assert cache.get_stats()['stale_hits'] == 1
+
+
+def test_failed_refresh_keeps_the_stale_value():
+    cache = ReadThroughCache(ttl=60)
+    cache.get('k', lambda: "old")
+    cache.invalidate()
+
+    def down():
+        raise ConnectionError("backend unreachable")
+
+    assert cache.get('k', down) == "old"
+    _wait_for(lambda: cache.get_stats()['errors'] == 1 and not cache._loading)
+    assert cache.get('k', down) == "old"
+
+
+def test_failed_load_is_not_cached():
+    cache = ReadThroughCache(ttl=60)
+
+    def down():
+        raise ConnectionError("backend unreachable")
+
+    with pytest.raises(ConnectionError):
+        cache.get('k', down)
+    assert cache.get('k', lambda: "value") == "value"
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ReadThroughCache(maxsize=2, ttl=60)
+    cache.get('a', lambda: 1)
+    cache.get('b', lambda: 2)
+    cache.get('a', lambda: 1)
+    cache.get('c', lambda: 3)
+    assert cache.get('b', lambda: "reloaded") == "reloaded"
+    assert cache.get_stats()['evictions'] == 2
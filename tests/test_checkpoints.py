@@ -0,0 +1,24 @@
+# tests/test_checkpoints.py
+import time
+
+from checkpoints import CheckpointStore
+
+
+def test_load_replays_a_checkpoint(tmp_path):
+    store = CheckpointStore(path=str(tmp_path / "checkpoints.db"), ttl=3600)
+    token = store.start("a@example.com", "Student", "v1")
+    store.set_user(token, 7)
+    store.answer(token, 2)
+    store.answer(token, 0)
+    state = store.load(token)
+    assert state['user_id'] == 7 and bytes(state['answers']) == b'\x02\x00'
+    store.close()
+
+
+def test_expired_checkpoint_is_not_resumable_before_compaction(tmp_path):
+    store = CheckpointStore(path=str(tmp_path / "checkpoints.db"), ttl=0.2, compact_interval=3600)
+    token = store.start("a@example.com", "Student", "v1")
+    assert store.load(token) is not None
+    time.sleep(0.3)
+    assert store.load(token) is None
+    store.close()
@@ -0,0 +1,33 @@
+# tests/test_migrate.py
+import json
+
+from migrate_to_supabase import Checkpoint
+
+
+def test_checkpoint_only_advances_past_finished_chunks(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    checkpoint = Checkpoint(path)
+    for chunk_last_id in (100, 200, 300):
+        checkpoint.start('results', chunk_last_id)
+
+    # Later chunks finish first; the earliest one is still running
+    checkpoint.finish('results', 300)
+    checkpoint.finish('results', 200)
+    assert checkpoint.last_id('results') == 0
+
+    checkpoint.finish('results', 100)
+    assert checkpoint.last_id('results') == 300
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == {'results': 300}
+
+
+def test_checkpoint_resumes_from_the_saved_id(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    checkpoint = Checkpoint(path)
+    checkpoint.start('users', 50)
+    checkpoint.start('users', 80)
+    checkpoint.finish('users', 50)
+
+    resumed = Checkpoint(path)
+    assert resumed.last_id('users') == 50
+    assert resumed.last_id('results') == 0
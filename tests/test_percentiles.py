@@ -0,0 +1,81 @@
+# tests/test_percentiles.py
+import threading
+
+import database
+from database import SQLiteBackend
+from percentiles import TAIL_WINDOW, PercentileService, PercentileSketch
+
+
+class ListBackend:
+    """Serves a fixed list of result rows through iter_results, as the backends do"""
+
+    identity = "list:test"
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def iter_results(self, page_size=1000, after_id=0, **filters):
+        rows = sorted(r for r in self.rows if r[0] > after_id)
+        for start in range(0, len(rows), page_size):
+            yield rows[start:start + page_size]
+
+
+def _row(result_id, analytical=0.5, communication=0.5):
+    return (result_id, f"user{result_id}@example.com", "Student", analytical, communication, None)
+
+
+def test_catch_up_counts_ids_that_commit_out_of_order():
+    backend = ListBackend([_row(1), _row(2), _row(4)])
+    sketch = PercentileSketch(version="v")
+    sketch.catch_up(backend)
+    # Id 3 commits after 4 was read
+    backend.rows.append(_row(3))
+    sketch.catch_up(backend)
+    sketch.catch_up(backend)
+    assert sketch.count() == 4
+    assert sketch.last_id == 4
+
+
+def test_recent_ids_survive_a_snapshot(tmp_path):
+    backend = ListBackend([_row(i) for i in range(1, TAIL_WINDOW + 50)])
+    sketch = PercentileSketch(version="v", source="list:test")
+    sketch.catch_up(backend)
+    path = str(tmp_path / "percentiles.npz")
+    sketch.save(path)
+
+    restored = PercentileSketch.load(path)
+    restored.catch_up(backend)
+    assert restored.count() == sketch.count() == TAIL_WINDOW + 49
+    assert restored.source == "list:test"
+
+
+def test_snapshot_from_another_database_is_rebuilt(tmp_path, backend):
+    path = str(tmp_path / "percentiles.npz")
+    user_id = backend.save_user("a@example.com", "Student")
+    backend.save_results(user_id, 0.9, 0.9, submission_id="s1")
+    service = PercentileService(path=path, min_count=1, version="v")
+    service.refresh()
+    assert service.sketch.count() == 1
+
+    other = SQLiteBackend(path=str(tmp_path / "other.db"))
+    other.init_db()
+    database.set_backend(other)
+    assert PercentileService(path=path, min_count=1, version="v").sketch.count() == 0
+
+
+def test_groups_can_be_listed_while_rows_are_added(tmp_path, backend):
+    service = PercentileService(path=str(tmp_path / "percentiles.npz"), min_count=1, version="v")
+    service._maybe_refresh = lambda: None
+    done = threading.Event()
+
+    def add():
+        for n in range(2000):
+            service.sketch.add_rows([(n + 1, "", f"profession{n}", 0.5, 0.5, None)])
+        done.set()
+
+    thread = threading.Thread(target=add)
+    thread.start()
+    while not done.is_set():
+        service.groups()
+    thread.join()
+    assert len(service.groups()) == 2000
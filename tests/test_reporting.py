@@ -0,0 +1,22 @@
+# tests/test_reporting.py
+import random
+
+from reporting import AggregateSummary, results_frames, summarize_results
+
+
+def test_streamed_summary_matches_the_aggregates(backend):
+    rng = random.Random(1)
+    users = [backend.save_user(f"user{i}@example.com", ["Student", "Other"][i % 2]) for i in range(6)]
+    for n in range(120):
+        backend.save_results(rng.choice(users), rng.random(), rng.random(), submission_id=f"s{n}")
+
+    frames = list(results_frames(page_size=50))
+    assert [len(frame) for frame in frames] == [50, 50, 20]
+    assert frames[0]['profession'].dtype == 'category'
+
+    scanned = summarize_results(page_size=50)
+    aggregates = AggregateSummary()
+    assert scanned.total == aggregates.total == 120
+    assert scanned.profiles().tolist() == aggregates.profiles().tolist()
+    assert scanned.professions().sort_index().tolist() == aggregates.professions().sort_index().tolist()
+    assert (scanned.histograms().to_numpy() == aggregates.histograms().to_numpy()).all()
@@ -0,0 +1,64 @@
+# tests/test_scoring_service.py
+import database
+import scoring_service
+from database import SQLiteBackend
+from scoring_service import ScoringService
+
+
+def test_unknown_user_only_fails_its_own_submission(backend):
+    user_id = backend.save_user("known@example.com", "Student")
+    results = ScoringService().submit_batch([
+        {'answers': [0, 0, 0, 0, 0], 'user_id': user_id, 'submission_id': 'a'},
+        {'answers': [0, 0, 0, 0, 0], 'user_id': 999, 'submission_id': 'b'},
+    ])
+    assert results[0]['user_id'] == user_id and 'error' not in results[0]
+    assert results[1] == {'error': "Unknown user_id", 'status': 404}
+    with backend.connection() as conn:
+        assert conn.execute("SELECT submission_id FROM results").fetchall() == [('a',)]
+
+
+def test_new_users_in_a_batch_are_created_once(backend):
+    submissions = [
+        {'answers': [1, 1, 1, 1, 1], 'email': f"user{i % 3}@example.com", 'profession': "Student"}
+        for i in range(9)
+    ]
+    results = ScoringService().submit_batch(submissions)
+    assert all('error' not in r for r in results)
+    assert len({r['user_id'] for r in results}) == 3
+    with backend.connection() as conn:
+        assert conn.execute("SELECT count(*) FROM users").fetchone()[0] == 3
+        assert conn.execute("SELECT count(*) FROM results").fetchone()[0] == 9
+
+
+def test_invalid_submissions_are_not_stored(backend):
+    results = ScoringService().submit_batch([
+        {'answers': [0, 0, 9, 0, 0], 'email': "a@example.com", 'profession': "Student"},
+        {'answers': [0, 0, 0, 0, 0], 'email': "a@site.test", 'profession': "Student"},
+    ])
+    assert [r['status'] for r in results] == [400, 400]
+    with backend.connection() as conn:
+        assert conn.execute("SELECT count(*) FROM results").fetchone()[0] == 0
+
+
+def test_malformed_ids_are_rejected_without_failing_the_batch(backend):
+    user_id = backend.save_user("known@example.com", "Student")
+    results = ScoringService().submit_batch([
+        {'answers': [0, 0, 0, 0, 0], 'user_id': user_id, 'submission_id': ["x"]},
+        {'answers': [0, 0, 0, 0, 0], 'user_id': 2 ** 70},
+        {'answers': [0, 0, 0, 0, 0], 'user_id': user_id, 'submission_id': 'ok'},
+    ])
+    assert [r['status'] for r in results[:2]] == [400, 400]
+    assert results[2]['submission_id'] == 'ok' and 'error' not in results[2]
+
+
+def test_shared_service_creates_the_tables(tmp_path, monkeypatch):
+    previous = database._backend
+    database.set_backend(SQLiteBackend(path=str(tmp_path / "fresh.db")))
+    monkeypatch.setattr(scoring_service, '_service', None)
+    try:
+        result = scoring_service.get_scoring_service().submit(
+            {'answers': [0, 0, 0, 0, 0], 'email': "new@example.com", 'profession': "Student"}
+        )
+        assert 'error' not in result and result['user_id'] > 0
+    finally:
+        database.set_backend(previous)
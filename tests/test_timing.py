@@ -0,0 +1,14 @@
+# tests/test_timing.py
+from benchmarks.timing import percentile
+
+
+def test_nearest_rank_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
+    assert percentile(list(range(1, 11)), 50) == 5
+    assert percentile(list(range(1, 21)), 95) == 19
+    assert percentile(values, 7) == 7
+    assert percentile([7], 0) == 7 and percentile([], 50) == 0.0
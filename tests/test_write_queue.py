@@ -0,0 +1,100 @@
+# tests/test_write_queue.py
+import json
+
+from write_queue import WriteBehindQueue
+
+
+class FlakyBackend:
+    """Collects bulk writes, or fails them all while down is set"""
+
+    def __init__(self):
+        self.down = False
+        self.results = []
+
+    def save_users_bulk(self, rows):
+        raise AssertionError("no users are queued in these tests")
+
+    def save_results_bulk(self, rows):
+        if self.down:
+            raise ConnectionError("backend unreachable")
+        self.results.extend(rows)
+
+
+def _queue(get_backend, tmp_path):
+    # A long interval keeps the flusher thread out of the way; the tests flush explicitly
+    return WriteBehindQueue(
+        get_backend, max_batch=8, flush_interval=3600,
+        spill_path=str(tmp_path / "spill.jsonl"), dead_letter_path=str(tmp_path / "rejected.jsonl")
+    )
+
+
+def _row(user_id, submission_id):
+    return {
+        'user_id': user_id,
+        'analytical_score': 0.5,
+        'communication_score': 0.5,
+        'created_at': '2024-01-01T00:00:00',
+        'submission_id': submission_id,
+        'answers': b'\x01\x02',
+    }
+
+
+def test_rows_spilled_while_down_are_replayed(tmp_path):
+    backend = FlakyBackend()
+    queue = _queue(lambda: backend, tmp_path)
+    backend.down = True
+    queue.enqueue('results', _row(1, 'a'))
+    queue.flush()
+    assert backend.results == [] and (tmp_path / "spill.jsonl").exists()
+
+    backend.down = False
+    queue.enqueue('results', _row(1, 'b'))
+    queue.flush()
+    queue.close()
+    assert [r['submission_id'] for r in backend.results] == ['b', 'a']
+    assert backend.results[1]['answers'] == b'\x01\x02'
+    assert not (tmp_path / "spill.jsonl").exists()
+
+
+def test_rejected_row_is_dead_lettered_and_the_rest_written(tmp_path, backend):
+    user_id = backend.save_user("a@example.com", "Student")
+    queue = _queue(lambda: backend, tmp_path)
+    for n in range(5):
+        queue.enqueue('results', _row(user_id, f"good{n}"))
+    # No such user: the foreign key rejects this row whenever it is written
+    queue.enqueue('results', _row(999, 'poison'))
+    queue.flush()
+    queue.flush()
+    queue.close()
+
+    with backend.connection() as conn:
+        stored = {row[0] for row in conn.execute("SELECT submission_id FROM results")}
+    assert stored == {f"good{n}" for n in range(5)}
+    assert not (tmp_path / "spill.jsonl").exists()
+    rejected = [json.loads(line) for line in (tmp_path / "rejected.jsonl").read_text().splitlines()]
+    assert [(r['table'], r['row']['submission_id']) for r in rejected] == [('results', 'poison')]
+
+
+def test_replayed_batch_with_a_rejected_row_is_not_spilled_again(tmp_path, backend):
+    user_id = backend.save_user("a@example.com", "Student")
+    down = [True]
+
+    def get_backend():
+        if down[0]:
+            raise ConnectionError("backend unreachable")
+        return backend
+
+    queue = _queue(get_backend, tmp_path)
+    queue.enqueue('results', _row(user_id, 'good'))
+    queue.enqueue('results', _row(999, 'poison'))
+    queue.flush()
+    assert (tmp_path / "spill.jsonl").exists()
+
+    down[0] = False
+    queue.flush()
+    queue.flush()
+    queue.close()
+    with backend.connection() as conn:
+        assert conn.execute("SELECT submission_id FROM results").fetchall() == [('good',)]
+    assert not (tmp_path / "spill.jsonl").exists()
+    assert len((tmp_path / "rejected.jsonl").read_text().splitlines()) == 1
@@ -0,0 +1,137 @@
+# validation.py
+import re
+import threading
+
+import config
+
+# Same rules as the original registration check, compiled once
+EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+MAX_EMAIL_LENGTH = 254
+
+# Reserved top-level domains (RFC 2606) that can never receive mail
+RESERVED_SUFFIXES = ('.test', '.example', '.invalid', '.localhost')
+
+# Used when no DISPOSABLE_DOMAINS_PATH list is configured
+DEFAULT_DISPOSABLE_DOMAINS = ('temp-mail.org', 'tempmail.com', 'throwawaymail.com')
+
+# Bulk validation results, in the order the checks are applied
+REASONS = ('ok', 'invalid_format', 'reserved_domain', 'disposable_domain')
+
+MESSAGES = {
+    'invalid_format': "Please enter a valid email address",
+    'reserved_domain': "Please use a valid email domain",
+    'disposable_domain': "Please use a valid business or personal email",
+}
+
+
+def is_valid_email(email: str) -> bool:
+    """
+    Validate email format.
+    Basic checks for:
+    - Has @ symbol
+    - Has valid domain
+    - No special characters except .-_%+
+    - Proper length and no consecutive dots
+    """
+    return (
+        len(email) <= MAX_EMAIL_LENGTH
+        and EMAIL_PATTERN.fullmatch(email) is not None
+        and '..' not in email
+    )
+
+
+class DisposableDomains:
+    """
+    Disposable email domains as a frozenset, matched on the domain and
+    every parent domain, so a listed domain also covers its subdomains.
+    A lookup costs one hash probe per label.
+    """
+
+    __slots__ = ('domains',)
+
+    def __init__(self, domains):
+        self.domains = frozenset(
+            domain.strip().lower().rstrip('.') for domain in domains if domain.strip()
+        )
+
+    @classmethod
+    def load(cls, path: str) -> 'DisposableDomains':
+        """One domain per line; blank lines and # comments are ignored"""
+        with open(path, encoding='utf-8') as f:
+            return cls(line.split('#', 1)[0] for line in f)
+
+    def __len__(self):
+        return len(self.domains)
+
+    def __contains__(self, domain: str) -> bool:
+        domain = domain.lower()
+        domains = self.domains
+        while True:
+            if domain in domains:
+                return True
+            dot = domain.find('.')
+            if dot < 0:
+                return False
+            domain = domain[dot + 1:]
+
+
+_disposable = None
+_disposable_lock = threading.Lock()
+
+
+def get_disposable_domains() -> DisposableDomains:
+    """The configured list (config.DISPOSABLE_DOMAINS_PATH), loaded once per process"""
+    global _disposable
+    if _disposable is None:
+        with _disposable_lock:
+            if _disposable is None:
+                if config.DISPOSABLE_DOMAINS_PATH:
+                    _disposable = DisposableDomains.load(config.DISPOSABLE_DOMAINS_PATH)
+                else:
+                    _disposable = DisposableDomains(DEFAULT_DISPOSABLE_DOMAINS)
+    return _disposable
+
+
+def check_email(email: str) -> str:
+    """Return the first failing reason in REASONS for a single address, or 'ok'"""
+    if not is_valid_email(email):
+        return 'invalid_format'
+    domain = email.rsplit('@', 1)[1].lower()
+    if domain.endswith(RESERVED_SUFFIXES):
+        return 'reserved_domain'
+    if domain in get_disposable_domains():
+        return 'disposable_domain'
+    return 'ok'
+
+
+def validate_emails(emails):
+    """
+    Validate many addresses at once. Returns a categorical pandas Series
+    of REASONS aligned with emails. Format checks are vectorized and the
+    disposable lookup runs once per distinct domain, not once per address.
+    """
+    import numpy as np
+    import pandas as pd
+
+    emails = pd.Series(emails, dtype='string')
+    reason = np.zeros(len(emails), dtype=np.int8)
+
+    valid = (
+        emails.str.len().le(MAX_EMAIL_LENGTH)
+        & emails.str.fullmatch(EMAIL_PATTERN.pattern)
+        & ~emails.str.contains('..', regex=False)
+    ).fillna(False).to_numpy(dtype=bool)
+    reason[~valid] = REASONS.index('invalid_format')
+
+    domains = emails[valid].str.rsplit('@', n=1).str[1].str.lower()
+    codes, uniques = pd.factorize(domains)
+    disposable = get_disposable_domains()
+    unique_reasons = np.fromiter((
+        REASONS.index('reserved_domain') if domain.endswith(RESERVED_SUFFIXES)
+        else REASONS.index('disposable_domain') if domain in disposable
+        else 0
+        for domain in uniques
+    ), dtype=np.int8, count=len(uniques))
+    reason[valid] = unique_reasons[codes]
+
+    return pd.Series(pd.Categorical.from_codes(reason, categories=REASONS), index=emails.index, name='reason')
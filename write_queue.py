@@ -0,0 +1,214 @@
+# write_queue.py
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from metrics import timed
+
+
+def _encode_row(row: dict) -> dict:
+    """Make a row JSON-safe; bytes values (packed answers) become tagged hex"""
+    return {
+        k: {'__bytes__': v.hex()} if isinstance(v, bytes) else v
+        for k, v in row.items()
+    }
+
+
+def _decode_row(row: dict) -> dict:
+    return {
+        k: bytes.fromhex(v['__bytes__']) if isinstance(v, dict) and '__bytes__' in v else v
+        for k, v in row.items()
+    }
+
+
+def _is_permanent(error: Exception) -> bool:
+    """True when the backend rejected the rows themselves, so writing them again cannot succeed"""
+    if isinstance(error, (sqlite3.IntegrityError, sqlite3.DataError)):
+        return True
+    # PostgREST errors carry the Postgres SQLSTATE (class 22 is bad data, 23 a
+    # constraint violation) or a PGRST1xx code for a request it could not parse
+    code = str(getattr(error, 'code', None) or '')
+    return code[:2] in ('22', '23') or code.startswith('PGRST1')
+
+
+class WriteBehindQueue:
+    """
+    In-process write-behind buffer for user and result rows.
+
+    Rows are collected per table and handed to the backend's bulk methods
+    by a background thread once max_batch rows are pending or
+    flush_interval seconds have passed. Rows the backend fails to take
+    are appended to a JSON-lines spill file and replayed on the next
+    successful flush, so nothing is lost while the backend is unreachable.
+    A chunk rejected for the rows themselves (a constraint or data error)
+    is split until the offending rows are isolated; those go to the
+    dead-letter file with their error instead of being retried forever.
+    on_write, if given, is called after every batch the backend accepts.
+    """
+
+    # Users are written before results so new user ids exist for the join
+    TABLES = ('users', 'results')
+
+    def __init__(self, get_backend, max_batch: int = 500, flush_interval: float = 1.0,
+                 spill_path: str = None, dead_letter_path: str = None, on_write=None):
+        self._get_backend = get_backend
+        self._on_write = on_write
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.spill_path = spill_path
+        self.dead_letter_path = dead_letter_path
+        self._pending = {table: [] for table in self.TABLES}
+        self._size = 0
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def enqueue(self, table: str, row: dict) -> bool:
+        """Queue a row for the given table; returns False once the queue is closed"""
+        if table not in self._pending:
+            raise ValueError(f"Unknown table '{table}'")
+        with self._cond:
+            if self._closed:
+                return False
+            self._pending[table].append(row)
+            self._size += 1
+            if self._size >= self.max_batch:
+                self._cond.notify()
+        return True
+
+    def pending(self) -> int:
+        with self._cond:
+            return self._size
+
+    def _take(self) -> dict:
+        with self._cond:
+            batch = self._pending
+            self._pending = {table: [] for table in self.TABLES}
+            self._size = 0
+        return batch
+
+    def flush(self):
+        """Write everything pending (and any spilled rows) to the backend now"""
+        with self._flush_lock:
+            self._write(self._take())
+
+    def _write(self, batch: dict):
+        if not any(batch.values()):
+            self._replay_spill()
+            return
+        try:
+            self._write_batch(batch)
+        except Exception as e:
+            print(f"Error flushing write-behind queue: {e}")
+            self._spill(batch)
+        else:
+            self._replay_spill()
+
+    def _write_batch(self, batch: dict):
+        """
+        Write batch in chunks of max_batch rows, trimming it as rows are
+        handled. On a transient failure the error is raised with batch
+        holding exactly the rows still to write.
+        """
+        backend = self._get_backend()
+        for table in self.TABLES:
+            chunks = [batch[table][start:start + self.max_batch]
+                      for start in range(0, len(batch.get(table) or ()), self.max_batch)]
+            save = getattr(backend, f'save_{table}_bulk')
+            while chunks:
+                chunk = chunks.pop(0)
+                try:
+                    with timed(f'db.save_{table}_bulk'):
+                        save(chunk)
+                except Exception as e:
+                    if not _is_permanent(e):
+                        batch[table] = [row for rows in [chunk] + chunks for row in rows]
+                        raise
+                    if len(chunk) == 1:
+                        self._dead_letter(table, chunk[0], e)
+                    else:
+                        # Bisect so the rows around the rejected one are still written
+                        half = len(chunk) // 2
+                        chunks[:0] = [chunk[:half], chunk[half:]]
+            batch[table] = []
+        if self._on_write is not None:
+            self._on_write()
+
+    def _dead_letter(self, table: str, row: dict, error: Exception):
+        print(f"Rejected a {table} row the backend will not accept: {error}")
+        if not self.dead_letter_path:
+            return
+        with self._spill_lock:
+            directory = os.path.dirname(self.dead_letter_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.dead_letter_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'table': table, 'row': _encode_row(row), 'error': str(error)}) + '\n')
+
+    def _spill(self, batch: dict):
+        if not self.spill_path:
+            print(f"Dropping {sum(map(len, batch.values()))} unwritten rows: no spill path configured")
+            return
+        with self._spill_lock:
+            directory = os.path.dirname(self.spill_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.spill_path, 'a', encoding='utf-8') as f:
+                for table in self.TABLES:
+                    for row in batch.get(table, ()):
+                        f.write(json.dumps({'table': table, 'row': _encode_row(row)}) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _replay_spill(self):
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return
+        with self._spill_lock:
+            replay_path = self.spill_path + '.replay'
+            # A leftover .replay file means a previous replay was interrupted
+            if not os.path.exists(replay_path):
+                os.replace(self.spill_path, replay_path)
+            batch = {table: [] for table in self.TABLES}
+            with open(replay_path, encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        batch[entry['table']].append(_decode_row(entry['row']))
+        try:
+            self._write_batch(batch)
+        except Exception as e:
+            print(f"Error replaying spilled writes: {e}")
+            self._spill(batch)
+        os.remove(replay_path)
+
+    def _run(self):
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            with self._cond:
+                while not self._closed and self._size < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed:
+                    return
+            self.flush()
+            deadline = time.monotonic() + self.flush_interval
+
+    def close(self):
+        """Stop the flusher thread and write out anything still pending"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self.flush()
+        atexit.unregister(self.close)